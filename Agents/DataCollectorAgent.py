@@ -1,59 +1,80 @@
-import yfinance as yf
-from langchain.tools import tool
-from langchain_openai import ChatOpenAI
-from langchain.agents import AgentExecutor, create_openai_functions_agent
-from  yahooquery import Ticker
-from langchain.prompts import ChatPromptTemplate,MessagesPlaceholder
-from DataExtraction.DataExtractor import DataExtractorAgent
-from langchain.memory import ConversationBufferMemory
+from langchain_core.tools import tool
+from langchain_core.prompts import ChatPromptTemplate,MessagesPlaceholder
+from Agents.llm import get_llm
+from Agents.sessions import SessionStore
+from Agents.parallel import build_executor, run_sync
 from tools.sec_filings import get_sec_filings
+from tools.filing_index import search_filings
+from tools.fundamentals import get_fundamentals
 from tools.news_sentiment import get_all_news
-from tools.stock_data import get_stock_data
+from tools.stock_data import get_complete_stock_info
+from tools.artifacts import read_artifact
+from tools.market_data import market_data
+from typing import List
+import threading
 
 
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-
 class DataCollectorAgent:
-    def __init__(self):
-        self.tools = [get_stock_data
-                      ,get_all_news,
+    def __init__(self, llm=None, parallel_tools=True):
+        self.tools = [get_complete_stock_info,
+                      get_all_news,
                       get_sec_filings,
-                      get_financial_ratios]
+                      search_filings,
+                      get_fundamentals,
+                      get_financial_ratios,
+                      get_financial_ratios_batch,
+                      read_artifact]
         
         self.prompt = ChatPromptTemplate.from_messages([
                 ("system","You are a Data Collector for a Financial Analyst"),
-                MessagesPlaceholder(variable_name="chat history"),
+                MessagesPlaceholder(variable_name="chat_history"),
                 ("human","{input}"),
                 MessagesPlaceholder(variable_name="agent_scratchpad")
             ])
-        self.agent = create_openai_functions_agent(llm,
-                                                   self.tools)
-        self.memory = ConversationBufferMemory(memory_key="chat_history",
-                                               return_messages=True)
-        self.executor = AgentExecutor(self.agent,
-                                      tools=self.tools,
-                                      max_iter = 5,
-                                      verbose = True,
-                                      memory=self.memory)
+        self.parallel_tools = parallel_tools
+        # memory lives per session, not on the executor, so one instance can be shared
+        llm = llm or get_llm()
+        self.sessions = SessionStore(memory_key="chat_history", llm=llm)
+        self.executor = build_executor(llm,
+                                       self.tools,
+                                       self.prompt,
+                                       parallel_tools=parallel_tools,
+                                       max_iterations = 5,
+                                       verbose = True)
+
+    def run(self,query,session_id="default"):
+        if self.parallel_tools:
+            return run_sync(self.arun(query,session_id))
+        return self.sessions.invoke(self.executor,query,session_id)
+
+    async def arun(self,query,session_id="default"):
+        return await self.sessions.ainvoke(self.executor,query,session_id)
+
 
-    def run(self,query):
-        return self.executor.invoke({input:query})        
+_collector = None
+_collector_lock = threading.Lock()
+
+def get_data_collector() -> DataCollectorAgent:
+    """returns the process-wide warm DataCollectorAgent, building it on first use"""
+    global _collector
+    if _collector is None:
+        with _collector_lock:
+            if _collector is None:
+                _collector = DataCollectorAgent()
+    return _collector
 
 
 @tool
 def get_financial_ratios(ticker: str) -> dict:
     """fetch key financial ratios for a stock ticker."""
-    t = Ticker(ticker)
-    ratios = t.key_stats 
-    if not ratios:
-        return {"error": "No data found for ticker"}
-    
-    important_ratios = {
-        "pe_ratio": ratios.get("trailingPE"),
-        "pb_ratio": ratios.get("priceToBook"),
-        "roe": ratios.get("returnOnEquity"),
-        "current_ratio": ratios.get("currentRatio"),
-        "debt_to_equity": ratios.get("debtToEquity")
-    }
-    return important_ratios
+    symbol = ticker.strip().upper()
+    if not symbol:
+        return {"error": "Missing ticker"}
+    return market_data.ratios([symbol])[symbol]
+
 
+@tool
+def get_financial_ratios_batch(tickers: List[str]) -> dict:
+    """fetch key financial ratios for a list of stock tickers in one go.
+    Use this instead of calling get_financial_ratios repeatedly when screening several tickers."""
+    return market_data.ratios(tickers)
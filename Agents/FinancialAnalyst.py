@@ -1,40 +1,58 @@
-from langchain.tools import tool
-from langchain_openai import ChatOpenAI
-from langchain.agents import AgentExecutor, create_openai_functions_agent
-from langchain.memory import ConversationBufferMemory
-from langchain.prompts import ChatPromptTemplate,MessagesPlaceholder
-from Agents.DataCollectorAgent import DataCollectorAgent
+from contextvars import ContextVar
+from langchain_core.tools import tool
+from langchain_core.prompts import ChatPromptTemplate,MessagesPlaceholder
+from Agents.llm import get_llm
+from Agents.DataCollectorAgent import get_data_collector
+from Agents.sessions import SessionStore
+from Agents.parallel import build_executor, run_sync
 from tools.valuation_tools import calculate_dcf,calculate_ddm,calculate_comparable_valuation
 from tools.stock_data import get_complete_stock_info
+from tools.artifacts import read_artifact
 
 
-llm = ChatOpenAI(model="gpt-4o-mini",temperature=0)
+# session of the analyst turn in progress, so delegations land in the matching collector session
+current_session = ContextVar("analyst_session", default="default")
 
 class FinancialAnalyst():
-    def __init__(self):
+    def __init__(self, llm=None, parallel_tools=True):
         self.tools=[use_data_collector_agent,
                     calculate_dcf,calculate_ddm,
                     calculate_comparable_valuation,
-                    get_complete_stock_info]
+                    get_complete_stock_info,
+                    read_artifact]
 
         self.prompt = ChatPromptTemplate.from_messages([
                 ("system","You are a Data Collector for a Financial Analyst"),
-                MessagesPlaceholder(variable_name="chat history"),
+                MessagesPlaceholder(variable_name="chat_history"),
                 ("human","{input}"),
                 MessagesPlaceholder(variable_name="agent_scratchpad")
             ])
-        self.agent = create_openai_functions_agent(llm,self.tools)
-        
-        self.memory = ConversationBufferMemory(memory_key="chat_history",
-                                               return_messages = True)
+        self.parallel_tools = parallel_tools
+        llm = llm or get_llm()
+        self.sessions = SessionStore(memory_key="chat_history", llm=llm)
+
+        self.executor = build_executor(llm,
+                                       self.tools,
+                                       self.prompt,
+                                       parallel_tools=parallel_tools,
+                                       max_iterations=5,
+                                       verbose=True)
 
-        self.executor = AgentExecutor(self.agent,
-                                      tools=self.tools,
-                                      max_iter=5,
-                                      verbose=True)
+    def run(self,query,session_id="default"):
+        if self.parallel_tools:
+            return run_sync(self.arun(query,session_id))
+        token = current_session.set(session_id)
+        try:
+            return self.sessions.invoke(self.executor,query,session_id)
+        finally:
+            current_session.reset(token)
 
-        def run(self,query):
-            return self.executor.invoke({input:query})
+    async def arun(self,query,session_id="default"):
+        token = current_session.set(session_id)
+        try:
+            return await self.sessions.ainvoke(self.executor,query,session_id)
+        finally:
+            current_session.reset(token)
         
 @tool 
 def use_data_collector_agent(query:str)->str:
@@ -45,9 +63,4 @@ def use_data_collector_agent(query:str)->str:
     - "What's the current stock price for MSFT?"
     - "Get news sentiment for TSLA"
     """
-    DataCollector = DataCollectorAgent()
-    return DataCollector.run(query)
-
-
-     
-    
\ No newline at end of file
+    return get_data_collector().run(query, session_id=current_session.get())
@@ -0,0 +1,32 @@
+import threading
+
+MODEL_NAME = "gpt-4o-mini"
+
+_llm = None
+_lock = threading.Lock()
+
+
+def get_llm():
+    """the one ChatOpenAI client shared by the analyst, the collector and the extractor.
+
+    Built on first use rather than at import, so importing a tool costs neither the
+    langchain_openai import nor a credentials check. Every call it makes is admitted
+    by the shared LLM scheduler (Agents.scheduler).
+    """
+    global _llm
+    if _llm is None:
+        with _lock:
+            if _llm is None:
+                from langchain_openai import ChatOpenAI
+                from Agents.scheduler import scheduled
+                _llm = scheduled(ChatOpenAI(model=MODEL_NAME, temperature=0))
+    return _llm
+
+
+def set_llm(llm):
+    """replace the shared client (stub models in benchmarks, a wrapped client, ...);
+    the replacement is scheduled like the default one"""
+    from Agents.scheduler import scheduled
+    global _llm
+    with _lock:
+        _llm = scheduled(llm)
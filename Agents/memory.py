@@ -0,0 +1,137 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from tools.artifacts import artifacts
+
+_encoding = None
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """token count of a string; falls back to ~4 chars per token without tiktoken"""
+    if not text:
+        return 0
+    if _get_encoding():
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+SUMMARY_PROMPT = """Progressively summarize the conversation between a user and a financial data assistant.
+Keep tickers, figures, dates and conclusions; drop pleasantries and raw data dumps.
+
+Current summary:
+{summary}
+
+New lines of conversation:
+{lines}
+
+New summary:"""
+
+
+class BoundedSummaryMemory:
+    """conversation memory that keeps the replayed history under a hard token budget.
+
+    The most recent turns are kept verbatim, older turns are folded into a running
+    summary, and tool-sized outputs go to the artifact store: the history only carries
+    a short preview and a handle that get_output() or the read_artifact tool resolves.
+    Drop-in for the load_memory_variables/save_context part of langchain's
+    ConversationBufferMemory.
+    """
+    def __init__(self, memory_key="chat_history", max_tokens=2000, recent_turns=4,
+                 max_output_chars=1500, llm=None, store=artifacts):
+        self.memory_key = memory_key
+        self.max_tokens = max_tokens
+        self.recent_turns = recent_turns
+        self.max_output_chars = max_output_chars
+        self.llm = llm
+        self.store = store
+        self.summary = ""
+        self.turns = []      # (human, ai) pairs kept verbatim
+        self.refs = []       # handles of oversized messages moved to the store
+
+    def get_output(self, ref):
+        """full text behind a reference left in the history"""
+        return self.store.get(ref)
+
+    def save_context(self, inputs, outputs):
+        human = self._offload(str(inputs.get("input", "")))
+        ai = self._offload(str(outputs.get("output", "")))
+        self.turns.append((human, ai))
+
+        overflow = max(0, len(self.turns) - self.recent_turns)
+        while len(self.turns) - overflow > 1 and self._tokens(self.turns[overflow:]) > self._turn_budget():
+            overflow += 1
+        if overflow:
+            self.summary = self._summarize(self.turns[:overflow])
+            self.turns = self.turns[overflow:]
+
+    def load_memory_variables(self, inputs=None):
+        return {self.memory_key: self.messages()}
+
+    def messages(self):
+        history = []
+        if self.summary:
+            history.append(SystemMessage(content=f"Summary of the earlier conversation: {self.summary}"))
+        for human, ai in self.turns:
+            history.append(HumanMessage(content=human))
+            history.append(AIMessage(content=ai))
+        return history
+
+    def prompt_tokens(self):
+        """tokens this memory adds to every prompt"""
+        return count_tokens(self.summary) + self._tokens(self.turns)
+
+    def clear(self):
+        """forget the conversation, including the messages offloaded to the store"""
+        for ref in self.refs:
+            self.store.discard(ref)
+        self.summary = ""
+        self.turns = []
+        self.refs = []
+
+    def _offload(self, text):
+        if len(text) <= self.max_output_chars:
+            return text
+        # pinned: the store's LRU bound must not drop text the history still points to
+        ref = self.store.put("message", text, pinned=True)
+        self.refs.append(ref)
+        preview = text[:self.max_output_chars // 3]
+        return f"{preview}... [full output stored as {ref}, {len(text):,} chars]"
+
+    def _summary_budget(self):
+        return self.max_tokens // 4
+
+    def _turn_budget(self):
+        return self.max_tokens - self._summary_budget()
+
+    def _tokens(self, turns):
+        return sum(count_tokens(human) + count_tokens(ai) for human, ai in turns)
+
+    def _summarize(self, turns):
+        lines = "\n".join(f"Human: {human}\nAI: {ai}" for human, ai in turns)
+        summary = None
+        if self.llm is not None:
+            try:
+                summary = self.llm.invoke(SUMMARY_PROMPT.format(summary=self.summary or "(none)",
+                                                                lines=lines)).content
+            except Exception as e:
+                print(f"Error summarizing memory: {e}")
+        if summary is None:
+            # extractive fallback: the start of every folded turn
+            folded = " | ".join(f"Q: {human[:120]} A: {ai[:200]}" for human, ai in turns)
+            summary = f"{self.summary} | {folded}" if self.summary else folded
+        return self._truncate(summary, self._summary_budget())
+
+    def _truncate(self, text, budget):
+        # keep the most recent part of an over-long summary
+        while count_tokens(text) > budget and len(text) > 1:
+            text = text[len(text) // 8 + 1:]
+        return text
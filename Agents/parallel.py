@@ -0,0 +1,40 @@
+import asyncio
+import contextvars
+import threading
+
+
+def build_executor(llm, tools, prompt, parallel_tools=True, **kwargs):
+    """builds the agent executor for an agent.
+
+    With parallel_tools the agent uses the OpenAI tools API, so the model can ask
+    for several tool calls in a single turn. Driven through ainvoke, AgentExecutor
+    gathers those calls concurrently (sync tools run on the default thread pool),
+    which saves both LLM round-trips and wall time. Without it the agent falls back
+    to the functions API: one tool per step, executed in order.
+    """
+    from langchain.agents import AgentExecutor, create_openai_functions_agent, create_openai_tools_agent
+    create_agent = create_openai_tools_agent if parallel_tools else create_openai_functions_agent
+    agent = create_agent(llm, tools, prompt)
+    return AgentExecutor(agent=agent, tools=tools, **kwargs)
+
+
+def run_sync(coro):
+    """runs a coroutine to completion from sync code, even if a loop is already running"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    # inside a running loop (notebooks, async servers): use a helper thread
+    outcome = {}
+    def target():
+        try:
+            outcome["result"] = asyncio.run(coro)
+        except BaseException as e:
+            outcome["error"] = e
+    worker = threading.Thread(target=contextvars.copy_context().run, args=(target,))
+    worker.start()
+    worker.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
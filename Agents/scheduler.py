@@ -0,0 +1,266 @@
+"""One admission queue in front of every model call.
+
+The analyst, the collector, the memory summarizer and the extractor all call the
+model through the shared client from Agents.llm, which carries the scheduler's
+callback handler. Before each call the handler blocks until the scheduler admits
+it:
+
+- requests-per-minute and tokens-per-minute budgets are token buckets, refilled
+  continuously; a call is charged its estimated prompt tokens plus a completion
+  reserve, and the estimate is corrected with the real usage when it returns;
+- waiting calls are admitted strictly by priority, then arrival order, so an
+  interactive agent turn never queues behind a backlog of background extraction;
+- a 429 from the provider pauses admissions for its Retry-After.
+
+Priority travels in a context variable: SessionStore marks agent turns as
+interactive and everything else (pipelines, bulk ingestion) defaults to background.
+
+    with priority("interactive"):
+        llm.invoke(...)
+
+Budgets come from LLM_RPM / LLM_TPM (unset means unlimited) and LLM_MAX_CONCURRENT.
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import partial
+from langchain_core.callbacks import AsyncCallbackHandler
+from Observability.tracing import token_usage
+
+PRIORITIES = {"interactive": 0, "background": 1}
+# tokens reserved for the completion when the call doesn't set max_tokens
+COMPLETION_RESERVE = 500
+
+_priority = ContextVar("llm_priority", default="background")
+
+
+@contextmanager
+def priority(level: str):
+    """run the block's model calls at `level` ("interactive" or "background")"""
+    if level not in PRIORITIES:
+        raise ValueError(f"Unknown priority {level!r}, expected one of {list(PRIORITIES)}")
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+class TokenBucket:
+    """`per_minute` units, refilled continuously; the level may go negative when
+    a call turns out to cost more than it was charged"""
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now) -> float:
+        self._refill(now)
+        # a single call larger than the whole budget waits for a full bucket, not forever
+        return max(0.0, (min(amount, self.capacity) - self.level) / self.rate)
+
+    def take(self, amount, now):
+        self._refill(now)
+        self.level -= amount
+
+
+@dataclass
+class Ticket:
+    tokens: int
+    level: str
+    waited: float
+
+
+class LLMScheduler:
+    # fraction of each budget left unused: calls reach the provider a little after
+    # they are admitted, and a provider bucket that is full meanwhile loses that refill
+    HEADROOM = 0.05
+
+    def __init__(self, rpm=None, tpm=None, max_concurrent=None, headroom=HEADROOM):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrent = max_concurrent
+        self.requests = TokenBucket(rpm * (1 - headroom)) if rpm else None
+        self.tokens = TokenBucket(tpm * (1 - headroom)) if tpm else None
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._waiting = []   # heap of (priority rank, arrival)
+        self._arrivals = itertools.count()
+        self._cond = threading.Condition()
+        self._stats = {level: {"admitted": 0, "waited_s": 0.0, "max_wait_s": 0.0} for level in PRIORITIES}
+        self.rate_limited = 0
+        self.tokens_used = 0
+        self.handler = SchedulerCallbackHandler(self)
+
+    def _delay(self, tokens, now):
+        """seconds until the head of the queue may go; None means wait for a release"""
+        if self.max_concurrent and self.in_flight >= self.max_concurrent:
+            return None
+        delays = [self.paused_until - now]
+        if self.requests:
+            delays.append(self.requests.wait_time(1, now))
+        if self.tokens:
+            delays.append(self.tokens.wait_time(tokens, now))
+        return max(delays)
+
+    def acquire(self, tokens: int, level: str = None) -> Ticket:
+        """block until a call of `tokens` estimated tokens may be sent"""
+        level = level or current_priority()
+        entry = (PRIORITIES[level], next(self._arrivals))
+        start = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            self._cond.notify_all()   # a higher-priority arrival takes over the head
+            try:
+                while True:
+                    if self._waiting[0] == entry:
+                        now = time.monotonic()
+                        delay = self._delay(tokens, now)
+                        if delay is not None and delay <= 0:
+                            heapq.heappop(self._waiting)
+                            if self.requests:
+                                self.requests.take(1, now)
+                            if self.tokens:
+                                self.tokens.take(tokens, now)
+                            self.in_flight += 1
+                            break
+                        self._cond.wait(delay)
+                    else:
+                        self._cond.wait()
+            except BaseException:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                raise
+            finally:
+                self._cond.notify_all()
+            waited = time.monotonic() - start
+            stats = self._stats[level]
+            stats["admitted"] += 1
+            stats["waited_s"] += waited
+            stats["max_wait_s"] = max(stats["max_wait_s"], waited)
+        return Ticket(tokens, level, waited)
+
+    def release(self, ticket: Ticket, used_tokens: int = None):
+        """a call finished; charge the difference between its estimate and real usage"""
+        with self._cond:
+            self.in_flight -= 1
+            used = ticket.tokens if used_tokens is None else used_tokens
+            self.tokens_used += used
+            if self.tokens and used_tokens is not None:
+                self.tokens.take(used_tokens - ticket.tokens, time.monotonic())
+            self._cond.notify_all()
+
+    def pause(self, seconds: float):
+        """hold every admission for `seconds` (the provider said we're over its limit)"""
+        with self._cond:
+            self.rate_limited += 1
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"rpm": self.rpm, "tpm": self.tpm,
+                    "in_flight": self.in_flight, "waiting": len(self._waiting),
+                    "rate_limited": self.rate_limited, "tokens_used": self.tokens_used,
+                    "by_priority": {level: dict(stats, waited_s=round(stats["waited_s"], 3),
+                                                max_wait_s=round(stats["max_wait_s"], 3))
+                                    for level, stats in self._stats.items()}}
+
+
+def _estimate_tokens(messages, invocation_params) -> int:
+    from Agents.memory import count_tokens
+    prompt = sum(count_tokens(message.content if isinstance(message.content, str) else str(message.content))
+                 for batch in messages for message in batch)
+    return prompt + (invocation_params.get("max_tokens") or COMPLETION_RESERVE)
+
+
+def _retry_after(error) -> float:
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return 1.0
+
+
+class SchedulerCallbackHandler(AsyncCallbackHandler):
+    """admits each chat model call through the scheduler before it is sent.
+
+    Attached to the model itself, so it also covers bound copies (bind_tools,
+    with_structured_output). Waiting happens on the handler's own threads: a
+    synchronous handler would be run on the event loop's default executor, where a
+    backlog of waiting background calls holds every worker and an interactive call
+    cannot even reach the queue. Synchronous calls run the hooks to completion
+    before sending, as langchain does for any async handler.
+    """
+    # waiting admissions each hold a thread; size for the deepest expected backlog
+    MAX_WAITING = 256
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.tickets = {}   # run_id -> Ticket
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.MAX_WAITING, thread_name_prefix="llm-admission")
+            return self._executor
+
+    async def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        tokens = _estimate_tokens(messages, kwargs.get("invocation_params") or {})
+        acquire = partial(self.scheduler.acquire, tokens, current_priority())
+        ticket = await asyncio.get_running_loop().run_in_executor(self.executor, acquire)
+        with self._lock:
+            self.tickets[run_id] = ticket
+
+    def _release(self, run_id, used_tokens=None):
+        with self._lock:
+            ticket = self.tickets.pop(run_id, None)
+        if ticket is not None:
+            self.scheduler.release(ticket, used_tokens)
+
+    async def on_llm_end(self, response, *, run_id, **kwargs):
+        usage = token_usage(response)
+        used = (usage.get("prompt_tokens") or 0) + (usage.get("completion_tokens") or 0)
+        self._release(run_id, used or None)
+
+    async def on_llm_error(self, error, *, run_id, **kwargs):
+        self._release(run_id)
+        if getattr(error, "status_code", None) == 429:
+            self.scheduler.pause(_retry_after(error))
+
+
+def _env_int(name):
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+
+scheduler = LLMScheduler(rpm=_env_int("LLM_RPM"), tpm=_env_int("LLM_TPM"),
+                         max_concurrent=_env_int("LLM_MAX_CONCURRENT"))
+
+
+def scheduled(llm, with_scheduler: LLMScheduler = None):
+    """attach the scheduler's handler to a chat model (idempotent); returns the model"""
+    handler = (with_scheduler or scheduler).handler
+    callbacks = list(getattr(llm, "callbacks", None) or [])
+    if handler not in callbacks and hasattr(llm, "callbacks"):
+        llm.callbacks = callbacks + [handler]
+    return llm
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from Agents.memory import BoundedSummaryMemory
+from Agents.scheduler import priority
+from Observability import tracing
+
+
+class SessionStore:
+    """per-session conversation memory for a shared, long-lived agent.
+
+    The agent executor itself holds no memory, so one warm instance can serve
+    many sessions; each session gets its own memory plus a lock that keeps its
+    turns in order when the same session is driven from several threads.
+
+    Session ids come from clients, so a resident service would otherwise keep every
+    one it has seen: sessions idle for `idle_ttl` seconds are dropped, and past
+    `max_sessions` the least recently used ones, unless a turn is in progress.
+    """
+    def __init__(self, memory_key="chat_history", llm=None, max_tokens=2000, max_sessions=1000, idle_ttl=3600):
+        self.memory_key = memory_key
+        self.llm = llm
+        self.max_tokens = max_tokens
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.sessions = OrderedDict()   # session_id -> (memory, lock), least recently used first
+        self._last_used = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        """returns (memory, lock) for a session, creating them on first use"""
+        with self._lock:
+            if session_id not in self.sessions:
+                memory = BoundedSummaryMemory(memory_key=self.memory_key,
+                                              max_tokens=self.max_tokens,
+                                              llm=self.llm)
+                self.sessions[session_id] = (memory, threading.Lock())
+            now = time.monotonic()
+            self.sessions.move_to_end(session_id)
+            self._last_used[session_id] = now
+            self._evict(now)
+            return self.sessions[session_id]
+
+    def _evict(self, now):
+        stale = []
+        excess = len(self.sessions) - self.max_sessions
+        for session_id, (memory, lock) in self.sessions.items():
+            if now - self._last_used[session_id] <= self.idle_ttl and excess <= len(stale):
+                break
+            if not lock.locked():
+                stale.append(session_id)
+        for session_id in stale:
+            self._remove(session_id)
+
+    def _remove(self, session_id):
+        memory, _ = self.sessions.pop(session_id)
+        del self._last_used[session_id]
+        memory.clear()   # releases its offloaded messages in the artifact store
+
+    def history(self, memory):
+        return memory.load_memory_variables({})[self.memory_key]
+
+    def clear(self, session_id):
+        with self._lock:
+            if session_id in self.sessions:
+                self._remove(session_id)
+
+    def invoke(self, executor, query, session_id="default"):
+        """runs one turn of `executor` with the session's history and records it"""
+        memory, lock = self.get(session_id)
+        # agent turns have a user waiting: their model calls go ahead of background work
+        with lock, priority("interactive"):
+            result = executor.invoke({"input":query,
+                                      "chat_history":self.history(memory)},
+                                     config={"callbacks":tracing.callbacks()})
+            memory.save_context({"input":query},{"output":result["output"]})
+        return result["output"]
+
+    async def ainvoke(self, executor, query, session_id="default"):
+        """async twin of invoke; tool calls of one step run concurrently"""
+        memory, lock = self.get(session_id)
+        await asyncio.to_thread(lock.acquire)
+        try:
+            with priority("interactive"):
+                result = await executor.ainvoke({"input":query,
+                                                 "chat_history":self.history(memory)},
+                                                config={"callbacks":tracing.callbacks()})
+                memory.save_context({"input":query},{"output":result["output"]})
+        finally:
+            lock.release()
+        return result["output"]
@@ -0,0 +1,172 @@
+"""Offline bulk extraction through the provider's batch API.
+
+For non-urgent work (backfilling a universe, re-extracting a corpus) the chunks of
+many documents are submitted as one batch job, which runs on the provider's own
+queue at a discount and never touches the live RPM/TPM budgets the scheduler
+guards. Batch requests are independent, so unlike DataExtractorAgent's running
+extraction each chunk is extracted on its own and the per-chunk results are
+merged per document afterwards.
+
+    python -m DataExtraction.BatchExtractor submit cleaned_filings/*.txt
+    python -m DataExtraction.BatchExtractor collect batch_abc123 --out extracted.json --wait
+
+Uses the OpenAI SDK, so OPENAI_BASE_URL points it at a local stub
+(benchmarks/stub_openai.py) for testing.
+"""
+import argparse
+import io
+import json
+import os
+import time
+from typing import Dict, List
+
+from Agents.llm import MODEL_NAME
+from DataExtraction.DataExtractor import EXTRACTION_PROMPT, SCHEMAS, DataExtractorAgent
+
+ROLES = {"system": "system", "human": "user", "ai": "assistant"}
+# custom_id = <document id>::<chunk index>
+SEPARATOR = "::"
+
+
+def merge_extractions(schema, parts: List[dict]) -> dict:
+    """combine per-chunk extractions of one document, in chunk order:
+    first non-empty value for scalar fields, ordered union for list fields"""
+    merged = {}
+    for field in schema.model_fields:
+        values = [part.get(field) for part in parts if part.get(field)]
+        if not values:
+            merged[field] = None
+        elif any(isinstance(value, list) for value in values):
+            items = []
+            for value in values:
+                for item in (value if isinstance(value, list) else [value]):
+                    if item not in items:
+                        items.append(item)
+            merged[field] = items
+        else:
+            merged[field] = values[0]
+    return merged
+
+
+class BatchExtractor:
+    def __init__(self, schema: str = "get_sec_filings", client=None, model: str = MODEL_NAME):
+        self.schema_name = schema
+        self.schema = SCHEMAS[schema]
+        self.model = model
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI()
+        return self._client
+
+    def requests(self, documents: Dict[str, str]) -> List[dict]:
+        """one chat-completions request line per chunk of every document"""
+        schema = self.schema.model_json_schema()
+        response_format = {"type": "json_schema",
+                           "json_schema": {"name": self.schema_name, "schema": schema}}
+        lines = []
+        for doc_id, text in documents.items():
+            for index, chunk in enumerate(DataExtractorAgent.chunks(text)):
+                messages = EXTRACTION_PROMPT.format_messages(schema=schema, extracts=None, chunk=chunk)
+                lines.append({"custom_id": f"{doc_id}{SEPARATOR}{index}",
+                              "method": "POST",
+                              "url": "/v1/chat/completions",
+                              "body": {"model": self.model,
+                                       "temperature": 0,
+                                       "messages": [{"role": ROLES[m.type], "content": m.content} for m in messages],
+                                       "response_format": response_format}})
+        return lines
+
+    def submit(self, documents: Dict[str, str]) -> str:
+        """upload the requests and start a batch job; returns the batch id"""
+        payload = "\n".join(json.dumps(line) for line in self.requests(documents)).encode("utf-8")
+        uploaded = self.client.files.create(file=("extraction.jsonl", io.BytesIO(payload)), purpose="batch")
+        batch = self.client.batches.create(input_file_id=uploaded.id,
+                                           endpoint="/v1/chat/completions",
+                                           completion_window="24h",
+                                           metadata={"schema": self.schema_name})
+        return batch.id
+
+    def status(self, batch_id: str) -> dict:
+        batch = self.client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        return {"id": batch.id, "status": batch.status,
+                "completed": getattr(counts, "completed", None), "failed": getattr(counts, "failed", None),
+                "total": getattr(counts, "total", None)}
+
+    def results(self, batch_id: str) -> Dict[str, dict]:
+        """merged extraction per document id; chunks that failed are reported under "errors" """
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status != "completed":
+            raise RuntimeError(f"Batch {batch_id} is {batch.status}, not completed")
+        parts, errors = {}, {}
+        for line in self.client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            doc_id, index = record["custom_id"].rsplit(SEPARATOR, 1)
+            response = record.get("response") or {}
+            if record.get("error") or response.get("status_code") != 200:
+                errors.setdefault(doc_id, []).append(record.get("error") or response.get("body"))
+                continue
+            try:
+                content = response["body"]["choices"][0]["message"]["content"]
+                parts.setdefault(doc_id, []).append((int(index), json.loads(content)))
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                errors.setdefault(doc_id, []).append(f"Unreadable response: {e}")
+
+        results = {}
+        for doc_id in set(parts) | set(errors):
+            ordered = [part for _, part in sorted(parts.get(doc_id, []), key=lambda p: p[0])]
+            results[doc_id] = merge_extractions(self.schema, ordered)
+            if doc_id in errors:
+                results[doc_id]["errors"] = errors[doc_id]
+        return results
+
+    def wait(self, batch_id: str, poll_interval: float = 60, timeout: float = None) -> Dict[str, dict]:
+        start = time.monotonic()
+        while True:
+            status = self.status(batch_id)["status"]
+            if status == "completed":
+                return self.results(batch_id)
+            if status in ("failed", "expired", "cancelled"):
+                raise RuntimeError(f"Batch {batch_id} {status}")
+            if timeout is not None and time.monotonic() - start > timeout:
+                raise TimeoutError(f"Batch {batch_id} still {status} after {timeout}s")
+            time.sleep(poll_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+    submit = commands.add_parser("submit", help="submit text files for extraction")
+    submit.add_argument("files", nargs="+")
+    submit.add_argument("--schema", default="get_sec_filings", choices=sorted(SCHEMAS))
+    collect = commands.add_parser("collect", help="fetch and merge a finished batch")
+    collect.add_argument("batch_id")
+    collect.add_argument("--schema", default="get_sec_filings", choices=sorted(SCHEMAS))
+    collect.add_argument("--out", default="extracted.json")
+    collect.add_argument("--wait", action="store_true", help="poll until the batch finishes")
+    collect.add_argument("--poll-interval", type=float, default=60)
+    args = parser.parse_args()
+
+    extractor = BatchExtractor(args.schema)
+    if args.command == "submit":
+        documents = {}
+        for path in args.files:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                documents[os.path.splitext(os.path.basename(path))[0]] = f.read()
+        print(extractor.submit(documents))
+    else:
+        results = (extractor.wait(args.batch_id, args.poll_interval) if args.wait
+                   else extractor.results(args.batch_id))
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"{len(results)} documents written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,55 +1,135 @@
-from langchain_openai import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
-from typing import List, Optional,Type
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from contextlib import closing
+from langchain_core.prompts import ChatPromptTemplate
+from typing import AsyncIterator, Iterator, List, Optional,Type
 from pydantic import BaseModel
-from Schemas.extraction_schemas import get_sec_filings
-
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+from Agents.llm import get_llm
+from Schemas.extraction_schemas import get_sec_filings, NewsSentimentSchema
+from Observability import tracing
+from Observability.tracing import span
 
 def EXTRACT(tool,data):
-    Extractor = DataExtractorAgent(llm,tool)
+    Extractor = DataExtractorAgent(get_llm(),tool)
     return Extractor.extract(data)
 
+def stream_extract(tool, data, until=None):
+    """EXTRACT as a generator of progress updates; see DataExtractorAgent.stream"""
+    return DataExtractorAgent(get_llm(), tool).stream(data, until=until)
+
+SCHEMAS = {"get_sec_filings":get_sec_filings,
+           "get_news_sentiment":NewsSentimentSchema}
+
+EXTRACTION_PROMPT = ChatPromptTemplate.from_messages([ 
+    ("system", """You are a precise information extraction assistant. 
+        Your job is to read text documents and extract structured data according to the provided JSON schema:{schema}.
+        Always return output that matches the schema exactly — do not add explanations or commentary."""),
+    ("user", "Here is what you Extracted previously:{extracts}, now provide the schema again using your previous extracts and the data from this document using the schema provided. chunk:\n\n{chunk}")
+])
+
 class DataExtractorAgent:
     """extracts structured text from unstructured data using a given pydantic schema"""
     def __init__(self,llm,model):
-        self.classes= {"get_sec_filings":get_sec_filings}
+        self.classes= SCHEMAS
         self.model = self.classes[model]
         self.llm = llm.with_structured_output(self.model)
         self.extracts= None
         self.all_extracts = []
-        self.prompt = ChatPromptTemplate.from_messages([ 
-            ("system", """You are a precise information extraction assistant. 
-                Your job is to read text documents and extract structured data according to the provided JSON schema:{schema}.
-                Always return output that matches the schema exactly — do not add explanations or commentary."""),
-            ("user", "Here is what you Extracted previously:{extracts}, now provide the schema again using your previous extracts and the data from this document using the schema provided. chunk:\n\n{chunk}")
-        ])
+        self.prompt = EXTRACTION_PROMPT
     
     
-    def extract(self, text: str)->List[BaseModel]:
-        """Extract structured financial data from a filing chunk"""
+    def extract(self, text: str, previous=None)->List[BaseModel]:
+        """Extract structured financial data from a filing chunk.
+        `previous` seeds the running extraction, so only new text has to be read."""
+        return self.extract_chunks(self.chunks(text), previous)
+
+    def extract_chunks(self, chunks: List[str], previous=None):
+        """run the extraction over already split chunks"""
+        for _ in self.stream_chunks(chunks, previous):
+            pass
+        return self.extracts
+
+    def stream(self, text: str, previous=None, until: Optional[List[str]] = None) -> Iterator[dict]:
+        """Like extract, but yields progress after every chunk (see progress()).
+        With `until`, stops once those fields are filled; a consumer can also just
+        stop iterating, and no further chunks are sent."""
+        return self.stream_chunks(self.chunks(text), previous, until)
+
+    def stream_chunks(self, chunks: List[str], previous=None, until: Optional[List[str]] = None) -> Iterator[dict]:
         chain = self.prompt | self.llm
-        chunks = self.chunking_express(text)
-        if len(text) > 500:
-            for chunk in chunks:
-                self.extracts = chain.invoke({"chunk":chunk,
-                                            "extracts":self.extracts,
-                                            "schema":self.model.model_json_schema()
-                                            })
+        steps = self._steps(chunks, previous, until)
+        with closing(steps):
+            for inputs in steps:
+                try:
+                    reply = chain.invoke(inputs, config={"callbacks":tracing.callbacks()})
+                except Exception as e:
+                    steps.throw(e)   # recorded on the spans, then re-raised
+                yield steps.send(reply)
+
+    async def astream(self, text: str, previous=None, until: Optional[List[str]] = None) -> AsyncIterator[dict]:
+        """async version of stream()"""
+        chain = self.prompt | self.llm
+        steps = self._steps(self.chunks(text), previous, until)
+        with closing(steps):
+            for inputs in steps:
+                try:
+                    reply = await chain.ainvoke(inputs, config={"callbacks":tracing.callbacks()})
+                except Exception as e:
+                    steps.throw(e)
+                yield steps.send(reply)
+
+    def _steps(self, chunks: List[str], previous=None, until: Optional[List[str]] = None):
+        """the extraction loop shared by stream_chunks and astream, minus the model call:
+        yields each chunk's prompt inputs inside its span, takes the model's reply via
+        send() and yields the progress after it. The drivers only differ in how they
+        invoke the chain."""
+        if previous is not None:
+            self.extracts = previous
+        # not entered with `with`: the span stays open across yields to the consumer
+        extract_span = span("extract", schema=self.model.__name__, chunks=len(chunks), chars=sum(map(len, chunks)))
+        error = None
+        try:
+            for index, chunk in enumerate(chunks):
+                with extract_span.active(), span("llm.extract_chunk", chunk_index=index, chunk_chars=len(chunk)):
+                    self.extracts = yield self._inputs(chunk)
                 self.all_extracts.append(self.extracts)
-            return self.extracts
-        else :
-            self.extracts = chain.invoke({"chunk":chunk,
-                                            "extracts":self.extracts,
-                                            "schema":self.model.model_json_schema()
-                                            })
-            return self.extracts
-
-        
-       
-    def chunking_express(self,doc) ->List[str]:
+                progress = self.progress(index + 1, len(chunks), until)
+                extract_span.set_attribute("chunks_done", index + 1)
+                yield progress
+                if until and progress["complete"]:
+                    break
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            extract_span.end(error)
+
+    def progress(self, done: int, total: int, until: Optional[List[str]] = None) -> dict:
+        """the partial result so far, with chunks done/total and how many fields are filled"""
+        values = self.extracts.model_dump() if hasattr(self.extracts, "model_dump") else (self.extracts or {})
+        filled = [field for field in self.model.model_fields if values.get(field)]
+        missing = [field for field in (until or []) if not values.get(field)]
+        return {"schema": self.model.__name__,
+                "chunks_done": done,
+                "chunks_total": total,
+                "fields_filled": len(filled),
+                "fields_total": len(self.model.model_fields),
+                "missing": missing,
+                "complete": done == total or (bool(until) and not missing),
+                "result": self.extracts}
+
+    def _inputs(self, chunk):
+        return {"chunk":chunk,
+                "extracts":self.extracts,
+                "schema":self.model.model_json_schema()}
+
+    @staticmethod
+    def chunks(text: str) -> List[str]:
+        """the chunks extract() sends to the model, one LLM call each"""
+        return DataExtractorAgent.chunking_express(text) if len(text) > 500 else [text]
+
+    @staticmethod
+    def chunking_express(doc) ->List[str]:
         """chunks the text and returns a list of texts""" 
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
         splitter = RecursiveCharacterTextSplitter(
             chunk_size=2000,
             chunk_overlap=200,
@@ -0,0 +1,239 @@
+"""Incremental extraction across a company's filing history.
+
+Consecutive 10-Ks and 10-Qs repeat most of their text. Each cleaned line
+(a paragraph or table row once the HTML is stripped) is hashed, and the hashes of
+every filing already extracted for the company are kept. For a new filing, only
+lines that are not in the prior filing, plus a little surrounding context, go to
+the model. The extraction is seeded with the prior filing's result, so unchanged
+text is never re-read.
+
+Each filing also gets a "what changed" diff against the previous one (paragraphs
+added and removed, extracted fields that moved), and a report of the chunks sent
+compared with a full extraction. Its figures are parsed into the fundamentals
+store, so later multi-period questions never re-extract it.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+
+from Agents.llm import get_llm
+from DataExtraction.DataExtractor import DataExtractorAgent
+from Observability.tracing import span
+from tools.artifacts import to_jsonable
+from tools.filing_index import filing_index
+from tools.fundamentals import fundamentals
+
+# lines of unchanged text kept around each changed line, so numbers keep their labels
+CONTEXT_LINES = 2
+# changed paragraphs listed in a diff; the counts are always complete
+MAX_LISTED = 50
+LISTED_CHARS = 300
+
+ERROR_PREFIXES = ("Error downloading filing", "Error parsing filing")
+
+
+def normalize(line: str) -> str:
+    return " ".join(line.split())
+
+
+def paragraph_hash(line: str) -> str:
+    return hashlib.blake2b(normalize(line).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def paragraphs(text: str) -> List[str]:
+    return [normalize(line) for line in text.splitlines() if line.strip()]
+
+
+def changed_text(lines: List[str], changed: List[int], context: int = CONTEXT_LINES) -> str:
+    """changed lines with `context` lines either side, hunks separated by '...'"""
+    keep = sorted({j for i in changed for j in range(max(0, i - context), min(len(lines), i + context + 1))})
+    hunks, previous = [], None
+    for i in keep:
+        if previous is None or i != previous + 1:
+            hunks.append([])
+        hunks[-1].append(lines[i])
+        previous = i
+    return "\n...\n".join("\n".join(hunk) for hunk in hunks)
+
+
+def field_changes(before: dict, after: dict) -> Dict[str, dict]:
+    changes = {}
+    for field in sorted(set(before) | set(after)):
+        old, new = before.get(field), after.get(field)
+        if old == new:
+            continue
+        if isinstance(old, list) or isinstance(new, list):
+            old, new = old or [], new or []
+            changes[field] = {"added": [item for item in new if item not in old],
+                              "removed": [item for item in old if item not in new]}
+        else:
+            changes[field] = {"before": old, "after": new}
+    return changes
+
+
+def _listed(lines):
+    return [line[:LISTED_CHARS] for line in lines[:MAX_LISTED]]
+
+
+class ExtractionHistory:
+    """per (ticker, form type) list of extracted filings: accession, date, line hashes, result.
+
+    Kept in memory; with a root directory also persisted as one JSON file per
+    ticker and form type, written atomically.
+    """
+    def __init__(self, root: Optional[str] = None):
+        self.root = root
+        self.records = {}   # (ticker, formtype) -> [record], oldest first
+        self._lock = threading.Lock()
+
+    def _path(self, ticker, formtype):
+        # amended forms ("10-K/A") and class shares ("BRK/B") would otherwise name a subdirectory
+        name = re.sub(r"[^\w.-]", "_", f"{ticker}_{formtype}")
+        return os.path.join(self.root, f"{name}.json")
+
+    def get(self, ticker: str, formtype: str) -> List[dict]:
+        key = (ticker.upper(), formtype)
+        with self._lock:
+            if key not in self.records:
+                self.records[key] = []
+                if self.root and os.path.exists(self._path(*key)):
+                    try:
+                        with open(self._path(*key), encoding="utf-8") as f:
+                            self.records[key] = json.load(f)
+                    except (OSError, ValueError):
+                        pass   # unreadable history: extract from scratch
+            return list(self.records[key])
+
+    def add(self, ticker: str, formtype: str, record: dict):
+        key = (ticker.upper(), formtype)
+        self.get(*key)
+        with self._lock:
+            records = [r for r in self.records[key] if r["accession"] != record["accession"]]
+            records.append(record)
+            records.sort(key=lambda r: r["filing_date"] or "")
+            self.records[key] = records
+            if self.root:
+                os.makedirs(self.root, exist_ok=True)
+                tmp = f"{self._path(*key)}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(records, f)
+                os.replace(tmp, self._path(*key))
+
+    def clear(self):
+        with self._lock:
+            self.records = {}
+
+
+extraction_history = ExtractionHistory(os.environ.get("EXTRACTION_HISTORY_DIR"))
+
+
+class IncrementalExtractor:
+    def __init__(self, llm=None, history: ExtractionHistory = None, index=None, context_lines: int = CONTEXT_LINES,
+                 store=None):
+        self.llm = llm or get_llm()
+        self.history = history or extraction_history
+        self.index = index or filing_index
+        self.store = store or fundamentals
+        self.context_lines = context_lines
+
+    def extract(self, filing: dict) -> dict:
+        """extract one filing as returned by fetch_filings.
+
+        Returns {"result", "changes", "report"}; result is the schema as a dict.
+        """
+        ticker, formtype = filing["ticker"].upper(), filing["formtype"]
+        accession = filing["accession_number"]
+        history = self.history.get(ticker, formtype)
+        for record in history:
+            if record["accession"] == accession:
+                return {"result": record["result"], "changes": record["changes"],
+                        "report": dict(record["report"], cached=True)}
+
+        prior = [r for r in history if (r["filing_date"] or "") <= (filing["filing_date"] or "")]
+        previous = prior[-1] if prior else None
+        # diffed against the filing the extraction is seeded with: a line that reverts to
+        # an older filing's text still changes the seeded value
+        seen = set(previous["hashes"]) if previous else set()
+
+        lines = paragraphs(filing["text"])
+        hashes = [paragraph_hash(line) for line in lines]
+        changed = [i for i, h in enumerate(hashes) if h not in seen]
+
+        agent = DataExtractorAgent(self.llm, "get_sec_filings")
+        full_chunks = agent.chunks(json.dumps(filing, separators=(",", ":")))
+        chunks_full = len(full_chunks)
+
+        with span("extract.incremental", accession=accession, paragraphs=len(lines), changed=len(changed)):
+            if previous is None:
+                result = self._dump(agent.extract_chunks(full_chunks))
+                chunks_sent = chunks_full
+            elif not changed:
+                result = dict(previous["result"])
+                chunks_sent = 0
+            else:
+                delta = dict({k: v for k, v in filing.items() if k != "text"},
+                             changed_text=changed_text(lines, changed, self.context_lines))
+                delta_chunks = agent.chunks(json.dumps(delta, separators=(",", ":")))
+                chunks_sent = len(delta_chunks)
+                result = self._dump(agent.extract_chunks(delta_chunks, previous=previous["result"]))
+            if previous is not None:
+                # the seeded extraction still carries the prior filing's metadata
+                result["filing_date"] = filing["filing_date"]
+                result["form_type"] = formtype
+
+        report = {"accession": accession,
+                  "paragraphs": len(lines),
+                  "changed_paragraphs": len(changed),
+                  "chunks_full": chunks_full,
+                  "chunks_sent": chunks_sent,
+                  "chunk_reduction": round(1 - chunks_sent / chunks_full, 3) if chunks_full else 0.0}
+        changes = self._changes(previous, lines, hashes, result)
+        self.history.add(ticker, formtype, {"accession": accession, "filing_date": filing["filing_date"],
+                                            "hashes": hashes, "result": result,
+                                            "changes": changes, "report": report})
+        self.store.add(ticker, formtype, filing["filing_date"], result, accession)
+        return {"result": result, "changes": changes, "report": report}
+
+    def _changes(self, previous, lines, hashes, result) -> Optional[dict]:
+        if previous is None:
+            return None
+        current = set(hashes)
+        previous_hashes = set(previous["hashes"])
+        added = [line for line, h in zip(lines, hashes) if h not in previous_hashes]
+        removed_count = len(previous_hashes - current)
+        # removed text is only recoverable if the prior filing is in the local index
+        previous_text = self.index.text(previous["accession"])
+        removed = ([line for line in paragraphs(previous_text) if paragraph_hash(line) not in current]
+                   if previous_text else [])
+        return {"against": previous["accession"],
+                "against_date": previous["filing_date"],
+                "paragraphs_added": len(added),
+                "paragraphs_removed": removed_count,
+                "added": _listed(added),
+                "removed": _listed(removed),
+                "fields": field_changes(previous["result"], result)}
+
+    @staticmethod
+    def _dump(extracted) -> dict:
+        value = extracted.model_dump() if hasattr(extracted, "model_dump") else extracted
+        return to_jsonable(value) if isinstance(value, dict) else {"result": str(value)}
+
+
+def extract_filings(filings: List[dict], llm=None) -> dict:
+    """extract a company's filings oldest to newest, each incrementally against the last.
+
+    Returns the newest filing's extraction, with its "what changed" diff under
+    "changes" and one report per filing under "extraction".
+    """
+    extractor = IncrementalExtractor(llm)
+    usable = [f for f in filings if f.get("text") and not f["text"].startswith(ERROR_PREFIXES)]
+    if not usable:
+        return {"error": filings[0]["text"] if filings else "No filings to extract"}
+
+    outputs = [extractor.extract(f) for f in sorted(usable, key=lambda f: f["filing_date"] or "")]
+    latest = outputs[-1]
+    return dict(latest["result"], changes=latest["changes"],
+                extraction=[output["report"] for output in outputs])
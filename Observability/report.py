@@ -0,0 +1,79 @@
+"""Summarize a trace file written by Observability.tracing.
+
+    python -m Observability.report trace.jsonl [--by attribute]
+
+Prints, per span name: count, total/mean/p50/p95/max milliseconds, plus HTTP
+bytes and LLM tokens where present, then the slowest top-level spans.
+"""
+import argparse
+import json
+from collections import defaultdict
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def summarize(spans, by=None):
+    groups = defaultdict(list)
+    for s in spans:
+        key = s["name"]
+        if by and by in s["attributes"]:
+            key = f"{key} [{by}={s['attributes'][by]}]"
+        groups[key].append(s)
+
+    rows = []
+    for name, members in groups.items():
+        durations = [s["duration_ms"] for s in members]
+        attrs = [s["attributes"] for s in members]
+        rows.append({
+            "name": name,
+            "count": len(members),
+            "errors": sum(1 for s in members if s["status"] != "OK"),
+            "total_ms": sum(durations),
+            "mean_ms": sum(durations) / len(durations),
+            "p50_ms": percentile(durations, 0.5),
+            "p95_ms": percentile(durations, 0.95),
+            "max_ms": max(durations),
+            "bytes": sum(a.get("bytes") or 0 for a in attrs),
+            "prompt_tokens": sum(a.get("prompt_tokens") or 0 for a in attrs),
+            "completion_tokens": sum(a.get("completion_tokens") or 0 for a in attrs),
+        })
+    return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("trace")
+    parser.add_argument("--by", default=None, help="also group by this attribute, e.g. tool or url")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    spans = load(args.trace)
+    print(f"{len(spans)} spans in {len({s['trace_id'] for s in spans})} traces\n")
+    header = f"{'span':<40} {'count':>6} {'err':>4} {'total ms':>11} {'mean':>9} {'p50':>9} {'p95':>9} {'max':>9} {'bytes':>12} {'tok in':>8} {'tok out':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in summarize(spans, args.by):
+        print(f"{r['name'][:40]:<40} {r['count']:>6} {r['errors']:>4} {r['total_ms']:>11.1f} {r['mean_ms']:>9.1f} "
+              f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['max_ms']:>9.1f} {r['bytes']:>12,} "
+              f"{r['prompt_tokens']:>8,} {r['completion_tokens']:>8,}")
+
+    roots = sorted((s for s in spans if not s["parent_span_id"]), key=lambda s: s["duration_ms"], reverse=True)
+    if roots:
+        print("\nslowest top-level spans:")
+        for s in roots[:args.top]:
+            print(f"  {s['duration_ms']:>10.1f} ms  {s['name']}  {json.dumps(s['attributes'], default=str)[:100]}")
+
+
+if __name__ == "__main__":
+    main()
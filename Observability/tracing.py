@@ -0,0 +1,263 @@
+"""Nested timing spans for agent steps, tool calls, HTTP requests and LLM calls.
+
+Tracing is off unless TRACE_FILE is set or enable() is called; while off, span()
+hands back a shared no-op object and callbacks() returns no handlers, so the
+instrumented code pays one global lookup per call site.
+
+Spans are appended to a JSONL file, one span per line, using OpenTelemetry's
+field names (trace_id, span_id, parent_span_id, start/end_time_unix_nano,
+attributes). Summarize a trace with `python -m Observability.report trace.jsonl`.
+"""
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from langchain_core.callbacks import BaseCallbackHandler
+
+_current = ContextVar("current_span", default=None)
+_sink = None
+
+
+class JsonlSink:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps(record, default=str)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def enable(path):
+    """start writing spans to `path` (JSONL, appended)"""
+    global _sink
+    _sink = JsonlSink(path)
+
+
+def disable():
+    global _sink
+    _sink = None
+
+
+def enabled():
+    return _sink is not None
+
+
+class Span:
+    def __init__(self, name, parent=None, attributes=None):
+        self.name = name
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.attributes = dict(attributes or {})
+        self.status = "OK"
+        self.start = time.time_ns()
+        self._token = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes):
+        self.attributes.update(attributes)
+
+    def end(self, error=None):
+        if error is not None:
+            self.status = "ERROR"
+            self.attributes["error"] = f"{type(error).__name__}: {error}"
+        end = time.time_ns()
+        sink = _sink
+        if sink is not None:
+            sink.write({
+                "trace_id": self.trace_id,
+                "span_id": self.span_id,
+                "parent_span_id": self.parent.span_id if self.parent else None,
+                "name": self.name,
+                "start_time_unix_nano": self.start,
+                "end_time_unix_nano": end,
+                "duration_ms": round((end - self.start) / 1e6, 3),
+                "status": self.status,
+                "attributes": self.attributes,
+            })
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self._token)
+        self.end(exc)
+        return False
+
+    @contextmanager
+    def active(self):
+        """make this span the parent of spans opened in the block, without ending it.
+        For spans that outlive one block, e.g. across a generator's yields."""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+
+class _NoopSpan:
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, **attributes):
+        pass
+
+    def end(self, error=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def active(self):
+        return self
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name, **attributes):
+    """context manager timing a block as a child of the current span"""
+    if _sink is None:
+        return _NOOP
+    return Span(name, _current.get(), attributes)
+
+
+def traced(name):
+    """decorator form of span()"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _sink is None:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def token_usage(response) -> dict:
+    """prompt/completion token counts of an LLMResult, from llm_output or the messages' usage_metadata"""
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if not usage:
+        for generations in response.generations:
+            for generation in generations:
+                metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if metadata:
+                    usage = {"prompt_tokens": metadata.get("input_tokens"),
+                             "completion_tokens": metadata.get("output_tokens")}
+    return usage
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """turns langchain callbacks into spans: agent runs, agent steps, tool calls and LLM calls"""
+    # async runs would otherwise call this handler on an executor thread in a copied
+    # context, so the active tool span set in on_tool_start never reached the tool
+    run_inline = True
+
+    def __init__(self):
+        self.spans = {}     # run_id -> Span
+        self.parents = {}   # run_id -> parent run_id, for runs without a span of their own
+        self.steps = {}     # agent run_id -> steps taken
+
+    def _parent(self, run_id):
+        """nearest ancestor run that has a span, else the span active in this context"""
+        while run_id is not None:
+            if run_id in self.spans:
+                return self.spans[run_id]
+            run_id = self.parents.get(run_id)
+        return _current.get()
+
+    def _start(self, run_id, parent_run_id, name, **attributes):
+        self.spans[run_id] = Span(name, self._parent(parent_run_id), attributes)
+
+    def _end(self, run_id, error=None, **attributes):
+        current = self.spans.pop(run_id, None)
+        if current is not None:
+            current.set_attributes(**attributes)
+            current.end(error)
+
+    # top-level chains only; the agent's inner runnables would just add noise
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        if parent_run_id is None:
+            name = kwargs.get("name") or (serialized or {}).get("name") or "chain"
+            self._start(run_id, None, "agent.run", agent=name)
+        else:
+            self.parents[run_id] = parent_run_id
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self.parents.pop(run_id, None)
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self.parents.pop(run_id, None)
+        self._end(run_id, error)
+
+    def on_agent_action(self, action, *, run_id, parent_run_id=None, **kwargs):
+        step = self.steps.get(run_id, 0) + 1
+        self.steps[run_id] = step
+        parent = self._parent(run_id)
+        Span("agent.step", parent, {"step": step, "tool": action.tool}).end()
+
+    def on_agent_finish(self, finish, *, run_id, **kwargs):
+        self.steps.pop(run_id, None)
+
+    # tool spans also become the active span, so HTTP/parse spans inside the tool nest under them
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        self._start(run_id, parent_run_id, "tool.call", tool=(serialized or {}).get("name"))
+        self.spans[run_id]._token = _current.set(self.spans[run_id])
+
+    def _end_tool(self, run_id, error=None, **attributes):
+        current = self.spans.get(run_id)
+        if current is not None and current._token is not None:
+            try:
+                _current.reset(current._token)
+            except ValueError:
+                pass   # ended from another context; that context's copy is simply discarded
+        self._end(run_id, error, **attributes)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end_tool(run_id, output_chars=len(str(output)))
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end_tool(run_id, error)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        model = (kwargs.get("invocation_params") or {}).get("model_name") or \
+                (kwargs.get("invocation_params") or {}).get("model")
+        self._start(run_id, parent_run_id, "llm.call", model=model)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+        self._start(run_id, parent_run_id, "llm.call")
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        usage = token_usage(response)
+        self._end(run_id,
+                  prompt_tokens=usage.get("prompt_tokens"),
+                  completion_tokens=usage.get("completion_tokens"))
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+
+_handler = TracingCallbackHandler()
+
+
+def callbacks():
+    """langchain callbacks to pass as config={"callbacks": callbacks()}; empty when disabled"""
+    return [_handler] if _sink is not None else []
+
+
+if os.environ.get("TRACE_FILE"):
+    enable(os.environ["TRACE_FILE"])
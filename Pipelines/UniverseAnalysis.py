@@ -0,0 +1,352 @@
+"""Batch valuation of a ticker universe.
+
+Runs a staged DAG per ticker:
+
+    resolve_cik -> fetch_filings -> extract_filings --\
+                   fetch_market ----------------------+-> value
+                   fetch_news   -> extract_news
+
+Stages run as soon as their inputs are ready, so a ticker's fetches overlap.
+Every stage has its own concurrency limit shared across tickers, and every
+(ticker, stage) result is checkpointed as JSON, so a rerun after a crash picks
+up where it stopped. Checkpoints record a hash of the config they were made
+with; a rerun with another form type, filing count or rate redoes the affected
+stages. The config includes an as-of date (today by default) that every fetch
+depends on, so checkpoints only carry over within a run's day: tomorrow's run
+fetches fresh prices, news and filings. --fresh ignores checkpoints altogether.
+A failing stage only skips the stages that depend on it,
+for that ticker. Results land in one row per ticker (parquet, or CSV) with
+per-stage status and timings.
+
+    python -m Pipelines.UniverseAnalysis tickers.txt --out results.parquet
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from datetime import date
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from DataExtraction.DataExtractor import EXTRACT
+from DataExtraction.IncrementalExtractor import extract_filings as extract_incremental
+from tools.artifacts import artifacts, to_jsonable
+from tools.news_sentiment import collect_news
+from tools.sec_filings import fetch_filings, get_cik
+from tools.stock_data import fetch_stock_info
+from tools.valuation_tools import calculate_dcf, calculate_ddm
+
+
+@dataclass
+class PipelineConfig:
+    formtype: str = "10-K"
+    filings: int = 1
+    discount_rate: float = 0.09
+    terminal_growth_rate: float = 0.02
+    growth_rate: float = 0.05
+    # the data date: fetched data is only reused from checkpoints of the same as_of
+    as_of: str = field(default_factory=lambda: date.today().isoformat())
+
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[[str, Dict, PipelineConfig], object]
+    deps: List[str] = field(default_factory=list)
+    limit: int = 4
+    # PipelineConfig fields the stage's result depends on
+    config: List[str] = field(default_factory=list)
+
+
+def resolve_cik(ticker, inputs, config):
+    cik = get_cik(ticker)
+    if not cik:
+        raise LookupError(f"Could not find CIK for ticker {ticker}")
+    return cik
+
+
+def fetch_filings_stage(ticker, inputs, config):
+    filings = fetch_filings(inputs["resolve_cik"], ticker, config.formtype, config.filings)
+    if not filings:
+        raise LookupError(f"No {config.formtype} filings found for {ticker}")
+    return filings
+
+
+def fetch_market(ticker, inputs, config):
+    info = fetch_stock_info(ticker)
+    if "error" in info:
+        raise RuntimeError(info["error"])
+    return info
+
+
+def fetch_news(ticker, inputs, config):
+    return collect_news(ticker)
+
+
+def extract_filings(ticker, inputs, config):
+    result = extract_incremental(inputs["fetch_filings"])
+    if "error" in result:
+        raise RuntimeError(result["error"])
+    return result
+
+
+def extract_news(ticker, inputs, config):
+    if not inputs["fetch_news"]:
+        return {}
+    extracted = EXTRACT("get_news_sentiment", json.dumps(inputs["fetch_news"]))
+    return extracted.model_dump() if hasattr(extracted, "model_dump") else extracted
+
+
+def value(ticker, inputs, config):
+    handle = artifacts.put("stock_info", inputs["fetch_market"], key=ticker)
+    return {
+        "dcf": calculate_dcf.invoke({"discount_rate": config.discount_rate,
+                                     "terminal_growth_rate": config.terminal_growth_rate,
+                                     "growth_rate": config.growth_rate,
+                                     "ticker": ticker,
+                                     "stock_info": handle}),
+        "ddm": calculate_ddm.invoke({"discount_rate": config.discount_rate,
+                                     "stock_info": handle}),
+    }
+
+
+STAGES = [
+    Stage("resolve_cik", resolve_cik, limit=8, config=["as_of"]),
+    Stage("fetch_filings", fetch_filings_stage, deps=["resolve_cik"], limit=2,   # SEC asks for <10 req/s
+          config=["formtype", "filings", "as_of"]),
+    Stage("fetch_market", fetch_market, limit=4, config=["as_of"]),
+    Stage("fetch_news", fetch_news, limit=4, config=["as_of"]),
+    Stage("extract_filings", extract_filings, deps=["fetch_filings"], limit=2),
+    Stage("extract_news", extract_news, deps=["fetch_news"], limit=2),
+    Stage("value", value, deps=["extract_filings", "fetch_market"], limit=8,
+          config=["discount_rate", "terminal_growth_rate", "growth_rate"]),
+]
+
+
+def config_keys(stages, config) -> Dict[str, str]:
+    """stage -> hash of the config its result depends on, its own fields and its dependencies';
+    a checkpoint recorded under another key is stale (e.g. 10-K filings for a 10-Q run)"""
+    keys = {}
+    for stage in stages:
+        parts = {name: getattr(config, name) for name in stage.config}
+        parts.update({dep: keys[dep] for dep in stage.deps})
+        keys[stage.name] = hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()[:16]
+    return keys
+
+
+class CheckpointStore:
+    """one JSON file per (ticker, stage) under root/<ticker>/<stage>.json"""
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, ticker, stage):
+        return os.path.join(self.root, ticker, f"{stage}.json")
+
+    def load(self, ticker, stage) -> Optional[dict]:
+        path = self._path(ticker, stage)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None   # torn write from a crash: redo the stage
+
+    def save(self, ticker, stage, record):
+        path = self._path(ticker, stage)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(to_jsonable(record), f)
+        os.replace(tmp, path)
+
+
+class UniversePipeline:
+    def __init__(self, checkpoint_dir, config=None, stages=None, limits=None, fresh=False):
+        self.config = config or PipelineConfig()
+        self.fresh = fresh   # rerun every stage, overwriting existing checkpoints
+        self.stages = stages or STAGES   # in dependency order
+        self.checkpoints = CheckpointStore(checkpoint_dir)
+        limits = limits or {}
+        self.keys = config_keys(self.stages, self.config)
+        self.limits = {stage.name: limits.get(stage.name, stage.limit) for stage in self.stages}
+
+    def _resume(self, ticker, stage) -> Optional[dict]:
+        if self.fresh:
+            return None
+        record = self.checkpoints.load(ticker, stage.name)
+        if record is not None and record["status"] == "ok" and record.get("config") == self.keys[stage.name]:
+            record["resumed"] = True
+            return record
+        return None
+
+    def _execute(self, ticker, stage, inputs) -> dict:
+        start = time.perf_counter()
+        try:
+            record = {"status": "ok", "result": stage.run(ticker, inputs, self.config)}
+        except Exception as e:
+            record = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+        record["seconds"] = round(time.perf_counter() - start, 3)
+        record["config"] = self.keys[stage.name]
+        self.checkpoints.save(ticker, stage.name, record)
+        return record
+
+    def run_stages(self, tickers, workers=8, on_ticker=None) -> Dict[str, Dict[str, dict]]:
+        """runs (or resumes) every stage of every ticker; returns ticker -> stage -> checkpoint record.
+
+        A stage starts as soon as its dependencies have finished for that ticker, so
+        independent stages overlap, and a ticker waiting on one stage's limit never
+        holds up its other stages. At most `workers` stages run at once, and at most
+        its limit of each stage. `on_ticker(ticker, records)` is called as each ticker
+        finishes.
+        """
+        records = {ticker: {} for ticker in tickers}
+        ready = {stage.name: deque() for stage in self.stages}
+        running = {stage.name: 0 for stage in self.stages}
+        queued = set()
+        futures = {}
+
+        def advance(ticker):
+            # resume, skip or queue every stage whose dependencies are done
+            done = records[ticker]
+            for stage in self.stages:
+                if stage.name in done or (ticker, stage.name) in queued or any(d not in done for d in stage.deps):
+                    continue
+                failed = [dep for dep in stage.deps if done[dep]["status"] != "ok"]
+                if failed:
+                    done[stage.name] = {"status": "skipped", "error": f"upstream failed: {', '.join(failed)}",
+                                        "seconds": 0.0}
+                    continue
+                record = self._resume(ticker, stage)
+                if record is not None:
+                    done[stage.name] = record
+                else:
+                    queued.add((ticker, stage.name))
+                    ready[stage.name].append(ticker)
+            if len(done) == len(self.stages) and on_ticker:
+                on_ticker(ticker, done)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for ticker in tickers:
+                advance(ticker)
+            while True:
+                # later stages first, so tickers finish rather than all piling up mid-DAG
+                for stage in reversed(self.stages):
+                    while ready[stage.name] and running[stage.name] < self.limits[stage.name] and len(futures) < workers:
+                        ticker = ready[stage.name].popleft()
+                        inputs = {dep: records[ticker][dep]["result"] for dep in stage.deps}
+                        futures[pool.submit(self._execute, ticker, stage, inputs)] = (ticker, stage)
+                        running[stage.name] += 1
+                if not futures:
+                    break
+                finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    ticker, stage = futures.pop(future)
+                    running[stage.name] -= 1
+                    queued.discard((ticker, stage.name))
+                    records[ticker][stage.name] = future.result()
+                    advance(ticker)
+        return records
+
+    def run_ticker(self, ticker) -> Dict[str, dict]:
+        """runs (or resumes) every stage for one ticker; returns stage -> checkpoint record"""
+        return self.run_stages([ticker], workers=len(self.stages))[ticker]
+
+    def run(self, tickers, workers=8) -> List[dict]:
+        tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+        rows = {}
+
+        def finished(ticker, records):
+            rows[ticker] = self.to_row(ticker, records)
+            print(f"{ticker}: {rows[ticker]['status']}")
+
+        self.run_stages(tickers, workers, on_ticker=finished)
+        return [rows[ticker] for ticker in tickers]
+
+    def to_row(self, ticker, records) -> dict:
+        row = {"ticker": ticker}
+        errors = []
+        for stage in self.stages:
+            record = records[stage.name]
+            row[f"{stage.name}_status"] = record["status"]
+            row[f"{stage.name}_seconds"] = record.get("seconds")
+            if record["status"] == "error":
+                errors.append(f"{stage.name}: {record['error']}")
+        row["status"] = "ok" if all(r["status"] == "ok" for r in records.values()) else "partial"
+        row["error"] = "; ".join(errors) or None
+
+        def result(stage):
+            record = records.get(stage, {})
+            return (record.get("result") or {}) if record.get("status") == "ok" else {}
+
+        filing, market, news, valuation = (result("extract_filings"), result("fetch_market"),
+                                           result("extract_news"), result("value"))
+        reports = filing.get("extraction") or []
+        row.update({
+            "cik": records["resolve_cik"].get("result"),
+            "revenue": filing.get("revenue"),
+            "net_income": filing.get("net_income"),
+            "free_cash_flow": filing.get("free_cash_flow"),
+            "extraction_chunks_sent": sum(r["chunks_sent"] for r in reports) if reports else None,
+            "extraction_chunks_full": sum(r["chunks_full"] for r in reports) if reports else None,
+            "current_price": market.get("current_price"),
+            "market_cap": market.get("market_cap"),
+            "sentiment_label": news.get("sentiment_label"),
+            "sentiment_score": news.get("sentiment_score"),
+            "dcf_value": (valuation.get("dcf") or {}).get("present_value"),
+            "dcf_value_per_share": (valuation.get("dcf") or {}).get("value_per_share"),
+            "ddm_value": (valuation.get("ddm") or {}).get("intrinsic_value"),
+        })
+        return row
+
+
+def write_results(rows, path) -> str:
+    """writes results as parquet (or CSV when the path asks for it or pyarrow is missing)"""
+    import pandas as pd
+    frame = pd.DataFrame(rows)
+    if path.endswith(".csv"):
+        frame.to_csv(path, index=False)
+        return path
+    try:
+        frame.to_parquet(path, index=False)
+    except ImportError:
+        path = os.path.splitext(path)[0] + ".csv"
+        print(f"No parquet engine installed, writing {path} instead")
+        frame.to_csv(path, index=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Value a list of tickers with checkpointing")
+    parser.add_argument("tickers", help="file with one ticker per line")
+    parser.add_argument("--out", default="universe_results.parquet")
+    parser.add_argument("--checkpoint-dir", default=".universe_checkpoints")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--formtype", default="10-K")
+    parser.add_argument("--filings", type=int, default=1)
+    parser.add_argument("--discount-rate", type=float, default=0.09)
+    parser.add_argument("--as-of", default=date.today().isoformat(),
+                        help="data date; checkpoints from another date are refetched (default: today)")
+    parser.add_argument("--fresh", action="store_true", help="ignore existing checkpoints and rerun every stage")
+    parser.add_argument("--limit", action="append", default=[], metavar="STAGE=N",
+                        help="override a stage's concurrency limit, e.g. fetch_filings=1")
+    args = parser.parse_args()
+
+    with open(args.tickers, encoding="utf-8") as f:
+        tickers = [line.split("#")[0] for line in f]
+    limits = {name: int(n) for name, n in (item.split("=", 1) for item in args.limit)}
+    config = PipelineConfig(formtype=args.formtype, filings=args.filings, discount_rate=args.discount_rate,
+                            as_of=args.as_of)
+
+    pipeline = UniversePipeline(args.checkpoint_dir, config=config, limits=limits, fresh=args.fresh)
+    rows = pipeline.run(tickers, workers=args.workers)
+    path = write_results(rows, args.out)
+    ok = sum(1 for row in rows if row["status"] == "ok")
+    print(f"{ok}/{len(rows)} tickers fully valued, results in {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""Long-running analysis service.
+
+Keeps the model client, the agents, the pooled HTTP session and result caches
+warm across requests, and coalesces concurrent identical requests into one
+in-flight fetch/extraction whose result every caller shares.
+
+    python -m Service.server --port 8765
+    python -m Service.server --unix /tmp/analyst.sock
+
+Endpoints (JSON in, JSON out):
+    GET  /health
+    GET  /stats                  per-tool cache hits, executions and coalesced calls; LLM scheduler queues
+    POST /tools/<tool name>      body: the tool's arguments
+    POST /collector              body: {"query": ..., "session_id": ...}
+    POST /analyst                body: {"query": ..., "session_id": ...}
+    POST /extract/stream         body: {"ticker": ..., "schema": "get_sec_filings" | "get_news_sentiment",
+                                        "formtype": "10-K", "until": [field, ...]}
+                                 streams one JSON line of progress per extracted chunk
+"""
+import argparse
+import json
+import os
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from Agents.scheduler import priority
+from tools.artifacts import artifacts, read_artifact, to_jsonable
+from tools.coalesce import Coalescer
+from tools.filing_index import search_filings
+from tools.fundamentals import get_fundamentals
+from tools.news_sentiment import get_all_news
+from tools.sec_filings import get_sec_filings
+from tools.stock_data import get_complete_stock_info
+from tools.valuation_tools import calculate_comparable_valuation, calculate_dcf, calculate_ddm
+
+# tool -> result TTL in seconds; None means always run (cheap or not cacheable), still coalesced
+TOOL_TTLS = {
+    "get_sec_filings": 24 * 3600,
+    "search_filings": None,
+    "get_fundamentals": None,
+    "get_all_news": 15 * 60,
+    "get_complete_stock_info": 5 * 60,
+    "get_financial_ratios": 15 * 60,
+    "get_financial_ratios_batch": 15 * 60,
+    "calculate_dcf": None,
+    "calculate_ddm": None,
+    "calculate_comparable_valuation": None,
+    "read_artifact": None,
+}
+
+
+def _is_error(result):
+    return ((isinstance(result, dict) and "error" in result) or
+            (isinstance(result, str) and result.lstrip().startswith('{"error"')))
+
+
+def _artifact_alive(result):
+    """a cached reply pointing at an artifact is only reused while the store still has it;
+    the store's LRU bound can drop an artifact before the reply's TTL runs out"""
+    return not (isinstance(result, dict) and "artifact" in result) or artifacts.exists(result["artifact"])
+
+
+class AnalysisService:
+    """the warm state shared by every request"""
+    def __init__(self):
+        from Agents.DataCollectorAgent import get_financial_ratios, get_financial_ratios_batch
+        self.tools = {t.name: t for t in [get_sec_filings, search_filings, get_fundamentals, get_all_news,
+                                          get_complete_stock_info,
+                                          get_financial_ratios, get_financial_ratios_batch,
+                                          calculate_dcf, calculate_ddm, calculate_comparable_valuation,
+                                          read_artifact]}
+        self.coalescers = {name: Coalescer(ttl or 0) for name, ttl in TOOL_TTLS.items()}
+        self._analyst = None
+        self._lock = threading.Lock()
+
+    @property
+    def analyst(self):
+        if self._analyst is None:
+            with self._lock:
+                if self._analyst is None:
+                    from Agents.FinancialAnalyst import FinancialAnalyst
+                    self._analyst = FinancialAnalyst()
+        return self._analyst
+
+    def call_tool(self, name, args):
+        tool = self.tools.get(name)
+        if tool is None:
+            raise KeyError(name)
+        key = json.dumps(args, sort_keys=True, default=str)
+        cacheable = TOOL_TTLS[name] is not None
+        return self.coalescers[name].get(key, lambda: tool.invoke(args),
+                                         cache_if=lambda result: cacheable and not _is_error(result),
+                                         reuse_if=_artifact_alive)
+
+    def run_collector(self, query, session_id):
+        from Agents.DataCollectorAgent import get_data_collector
+        return get_data_collector().run(query, session_id=session_id)
+
+    def run_analyst(self, query, session_id):
+        return self.analyst.run(query, session_id=session_id)
+
+    def stream_extraction(self, ticker, schema="get_sec_filings", formtype="10-K", until=None):
+        """progress updates for extracting a ticker's latest filing or its news, one per chunk"""
+        from DataExtraction.DataExtractor import stream_extract
+        from tools.news_sentiment import collect_news
+        from tools.sec_filings import fetch_filings, get_cik
+        if schema == "get_news_sentiment":
+            data = json.dumps(collect_news(ticker))
+        else:
+            cik = get_cik(ticker)
+            if not cik:
+                raise LookupError(f"Could not find CIK for ticker {ticker}")
+            filings = fetch_filings(cik, ticker.upper(), formtype, 1)
+            if not filings:
+                raise LookupError(f"No {formtype} filings found for {ticker}")
+            data = json.dumps(filings, separators=(",", ":"))
+        for progress in stream_extract(schema, data, until=until):
+            result = progress["result"]
+            yield dict(progress, result=result.model_dump() if hasattr(result, "model_dump") else result)
+
+    def stats(self):
+        from Agents.scheduler import scheduler
+        stats = {name: coalescer.stats() for name, coalescer in self.coalescers.items()}
+        stats["llm_scheduler"] = scheduler.stats()
+        return stats
+
+    def warm_up(self):
+        """build the expensive pieces before the first request arrives"""
+        from Agents.DataCollectorAgent import get_data_collector
+        from Agents.llm import get_llm
+        get_llm()
+        get_data_collector()
+        self.analyst
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, status, payload):
+            body = json.dumps(to_jsonable(payload)).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _stream(self, events):
+            """newline-delimited JSON over chunked transfer encoding, one line per event"""
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                for event in events:
+                    line = json.dumps(to_jsonable(event)).encode() + b"\n"
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                # the client stopped reading: closing the generator stops the extraction
+                events.close()
+                self.close_connection = True
+                return
+            except Exception as e:
+                line = json.dumps({"error": f"{type(e).__name__}: {e}"}).encode() + b"\n"
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+            self.wfile.write(b"0\r\n\r\n")
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._reply(200, {"status": "ok"})
+            elif self.path == "/stats":
+                self._reply(200, service.stats())
+            else:
+                self._reply(404, {"error": f"Unknown endpoint {self.path}"})
+
+        def do_POST(self):
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                self._reply(400, {"error": "Request body must be JSON"})
+                return
+            # a caller is waiting on every request: its model calls run at interactive priority
+            with priority("interactive"):
+                self._dispatch(body)
+
+        def _dispatch(self, body):
+            try:
+                if self.path == "/extract/stream":
+                    if not body.get("ticker"):
+                        self._reply(400, {"error": "Missing ticker"})
+                        return
+                    self._stream(service.stream_extraction(body["ticker"],
+                                                           body.get("schema", "get_sec_filings"),
+                                                           body.get("formtype", "10-K"),
+                                                           body.get("until")))
+                    return
+                if self.path.startswith("/tools/"):
+                    name = self.path[len("/tools/"):]
+                    if name not in service.tools:
+                        self._reply(404, {"error": f"Unknown tool {name!r}"})
+                        return
+                    result = service.call_tool(name, body)
+                elif self.path in ("/collector", "/analyst"):
+                    if not body.get("query"):
+                        self._reply(400, {"error": "Missing query"})
+                        return
+                    run = service.run_analyst if self.path == "/analyst" else service.run_collector
+                    result = run(body["query"], body.get("session_id", "default"))
+                else:
+                    self._reply(404, {"error": f"Unknown endpoint {self.path}"})
+                    return
+            except Exception as e:
+                self._reply(500, {"error": f"{type(e).__name__}: {e}"})
+                return
+            self._reply(200, {"result": result})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class ServiceHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # the default backlog of 5 resets connections under any real concurrency
+    request_queue_size = 128
+
+
+def serve(service, port=8765, host="127.0.0.1", unix_socket=None):
+    handler = make_handler(service)
+    if unix_socket:
+        if os.path.exists(unix_socket):
+            os.unlink(unix_socket)
+        server = ThreadingUnixHTTPServer(unix_socket, handler)
+        print(f"Serving on unix socket {unix_socket}")
+    else:
+        server = ServiceHTTPServer((host, port), handler)
+        print(f"Serving on http://{host}:{server.server_address[1]}")
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="listen on a unix socket instead of TCP")
+    parser.add_argument("--no-warm-up", action="store_true")
+    args = parser.parse_args()
+
+    service = AnalysisService()
+    if not args.no_warm_up:
+        service.warm_up()
+    server = serve(service, args.port, args.host, args.unix)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
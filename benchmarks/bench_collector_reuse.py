@@ -0,0 +1,37 @@
+"""Per-delegation construction cost: fresh DataCollectorAgent vs the warm shared one.
+
+No network calls are made; a dummy key is set so ChatOpenAI can be built offline.
+
+    python -m benchmarks.bench_collector_reuse --iterations 50
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from Agents.DataCollectorAgent import DataCollectorAgent, get_data_collector
+
+
+def per_call(label, fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = (time.perf_counter() - start) / iterations
+    print(f"{label:<22} {elapsed * 1000:10.3f} ms/delegation")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    fresh = per_call("new DataCollectorAgent", DataCollectorAgent, args.iterations)
+    get_data_collector()  # warm-up build, paid once per process
+    warm = per_call("get_data_collector", get_data_collector, args.iterations)
+    print(f"construction cost saved per delegation: {(fresh - warm) * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Filing HTML cleaning throughput vs number of parser processes.
+
+Runs on a saved corpus of raw EDGAR submissions (build one with
+`python -m tools.filing_ingest AAPL MSFT ... --raw-dir corpus`), or on a
+synthetic corpus when --corpus is omitted. Fully offline:
+
+    python -m benchmarks.bench_filing_parse --corpus corpus --workers 1 2 4 8
+"""
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from tools.filing_ingest import available_cores
+from tools.filing_parser import clean_filing_content
+
+
+def synthetic_submission(i, paragraphs=1500):
+    rows = "\n".join(f"<tr><td style='x'>Line item {j} of filing {i}</td><td>{j * 1000 + i:,}</td></tr>"
+                     for j in range(paragraphs // 5))
+    body = "\n".join(f"<p><span>Paragraph {j} of filing {i}: revenue grew in segment {j % 7} "
+                     f"owing to demand, pricing and mix effects across regions.</span></p>"
+                     for j in range(paragraphs))
+    hidden = "<div style='display:none'><ix:header>hidden xbrl</ix:header></div>"
+    html = f"<html><head><title>10-K</title><style>p{{}}</style></head><body>{hidden}{body}<table>{rows}</table></body></html>"
+    return (f"<SEC-HEADER>header</SEC-HEADER>\n<DOCUMENT>\n<TYPE>10-K\n<FILENAME>doc{i}.htm\n<TEXT>\n{html}\n</TEXT>\n</DOCUMENT>\n"
+            f"<DOCUMENT>\n<TYPE>EX-101\n<FILENAME>ex-101{i}.xml\n<TEXT>\n<xml/>\n</TEXT>\n</DOCUMENT>\n")
+
+
+def load_corpus(path, synthetic):
+    if path:
+        docs = []
+        for name in sorted(glob.glob(os.path.join(path, "*.txt"))):
+            with open(name, encoding="utf-8", errors="replace") as f:
+                docs.append(f.read())
+        return docs
+    return [synthetic_submission(i) for i in range(synthetic)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", default=None, help="directory of raw .txt submissions")
+    parser.add_argument("--synthetic", type=int, default=32, help="synthetic documents when no corpus is given")
+    parser.add_argument("--workers", type=int, nargs="+", default=None)
+    args = parser.parse_args()
+
+    docs = load_corpus(args.corpus, args.synthetic)
+    if not docs:
+        raise SystemExit("empty corpus")
+    megabytes = sum(len(d) for d in docs) / 1e6
+    cores = available_cores()
+    worker_counts = args.workers or sorted({1, 2, 4, cores} & set(range(1, cores + 1)))
+    print(f"{len(docs)} documents, {megabytes:.1f} MB, {cores} cores available")
+
+    start = time.perf_counter()
+    for doc in docs:
+        clean_filing_content(doc)
+    inline = time.perf_counter() - start
+    print(f"{'inline':<10} {inline:8.2f}s  {len(docs) / inline:7.2f} docs/s")
+
+    for workers in worker_counts:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(clean_filing_content, docs[:workers]))   # warm the workers
+            start = time.perf_counter()
+            list(pool.map(clean_filing_content, docs))
+            elapsed = time.perf_counter() - start
+        speedup = inline / elapsed
+        print(f"{workers:>3} procs  {elapsed:8.2f}s  {len(docs) / elapsed:7.2f} docs/s  "
+              f"speedup {speedup:4.1f}x  efficiency {speedup / workers:4.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Throughput of batched vs one-at-a-time financial ratio fetching.
+
+Hits Yahoo live, so run it from the repo root with network access:
+
+    python -m benchmarks.bench_financial_ratios --tickers AAPL MSFT GOOG ...
+"""
+import argparse
+import time
+from tools.market_data import MarketData
+
+DEFAULT_TICKERS = ["AAPL", "MSFT", "GOOG", "AMZN", "META", "NVDA", "TSLA", "JPM", "V", "JNJ",
+                   "WMT", "PG", "XOM", "UNH", "HD", "KO", "PEP", "MRK", "ABBV", "CVX",
+                   "BAC", "COST", "DIS", "CSCO", "ADBE", "CRM", "NFLX", "INTC", "ORCL", "NKE"]
+
+
+def one_at_a_time(tickers):
+    market = MarketData()
+    results = {}
+    for ticker in tickers:
+        results.update(market.ratios([ticker]))
+    return results
+
+
+def timed(label, fn, tickers):
+    start = time.perf_counter()
+    results = fn(tickers)
+    elapsed = time.perf_counter() - start
+    errors = sum(1 for r in results.values() if "error" in r)
+    print(f"{label:<16} {len(tickers):>4} tickers  {elapsed:8.2f}s  "
+          f"{len(tickers) / elapsed:8.1f} tickers/s  errors={errors}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", nargs="+", default=DEFAULT_TICKERS)
+    parser.add_argument("--chunk-size", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    sequential = timed("one-at-a-time", one_at_a_time, args.tickers)
+    batched = timed("batched", lambda t: MarketData().ratios(
+        t, chunk_size=args.chunk_size, max_workers=args.workers), args.tickers)
+    print(f"speedup: {sequential / batched:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Multi-period, multi-company reads from the fundamentals store.
+
+Fills a store with synthetic extractions (figures as the model returns them,
+e.g. "$12.3 billion") for a universe of tickers, then answers "last N years of
+free cash flow for every ticker" with one scan, and the same question one
+ticker at a time. Offline:
+
+    python -m benchmarks.bench_fundamentals --tickers 200 --years 5
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from tools.fundamentals import FIELDS, FundamentalsStore
+
+
+def synthetic_extraction(rng, year):
+    result = {}
+    for field, kind in FIELDS.items():
+        if kind == "amount":
+            result[field] = f"${rng.uniform(-5, 400):,.1f} billion" if field != "free_cash_flow" else None
+        elif kind == "per_share":
+            result[field] = f"${rng.uniform(0.5, 12):.2f}"
+        elif kind == "percent":
+            result[field] = f"{rng.uniform(-10, 60):.1f}%"
+        else:
+            result[field] = f"{rng.uniform(0.2, 40):.2f}x"
+    result["filing_date"] = f"{year}-11-01"
+    return result
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = fn()
+        times.append(time.perf_counter() - start)
+    return value, statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=200)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    tickers = [f"T{i:04d}" for i in range(args.tickers)]
+    with tempfile.TemporaryDirectory() as root:
+        store = FundamentalsStore(root)
+        start = time.perf_counter()
+        rows = 0
+        for ticker in tickers:
+            for year in range(2025 - args.years, 2025):
+                # free cash flow is derived from operating cash flow and capex at ingest
+                rows += store.add(ticker, "10-K", f"{year}-11-01", synthetic_extraction(rng, year), f"{ticker}-{year}")
+        store.compact()
+        ingest = time.perf_counter() - start
+        size = os.path.getsize(store.main_path)
+        print(f"ingest: {rows} figures for {args.tickers} tickers x {args.years} years in {ingest:.2f}s, "
+              f"{size / 1024:.0f} KB on disk ({size / rows:.1f} bytes/figure)")
+
+        history, one_scan = timed(lambda: store.history("free_cash_flow", tickers, args.years), args.repeat)
+        _, per_ticker = timed(lambda: [store.history("free_cash_flow", [t], args.years) for t in tickers], args.repeat)
+        _, cross = timed(lambda: store.latest(["revenue", "net_income", "free_cash_flow"], tickers), args.repeat)
+        filled = int(history.notna().to_numpy().sum())
+        print(f"{args.years}-year free cash flow, {len(history)} tickers ({filled} values):")
+        print(f"  one scan:           {one_scan * 1000:8.1f} ms")
+        print(f"  ticker by ticker:   {per_ticker * 1000:8.1f} ms  ({per_ticker / one_scan:.0f}x slower)")
+        print(f"latest revenue/net income/FCF cross-section: {cross * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Cold-start import cost of each entry point, via `python -X importtime`.
+
+    python -m benchmarks.bench_import_time                 # this checkout
+    python -m benchmarks.bench_import_time --against HEAD~1 # side by side with another revision
+
+Each module is imported in a fresh interpreter, `--runs` times, and the best
+cumulative time is kept. OPENAI_API_KEY is set to a dummy value so revisions
+that build clients at import time can still be measured.
+"""
+import argparse
+import io
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+ENTRY_POINTS = ["tools.valuation_tools", "tools.stock_data", "tools.sec_filings", "tools.news_sentiment",
+                "DataExtraction.DataExtractor", "Agents.DataCollectorAgent", "Agents.FinancialAnalyst",
+                "Pipelines.UniverseAnalysis"]
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_ms(module, cwd, runs):
+    env = dict(os.environ, OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY", "sk-benchmark"), PYTHONPATH=cwd)
+    best = None
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                              cwd=cwd, env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            return None
+        for line in reversed(proc.stderr.splitlines()):
+            fields = line.split("|")
+            if len(fields) == 3 and fields[2].strip() == module:
+                cumulative = int(fields[1]) / 1000
+                best = cumulative if best is None else min(best, cumulative)
+                break
+    return best
+
+
+def checkout(rev, target):
+    archive = subprocess.run(["git", "archive", rev], cwd=ROOT, capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(target)
+
+
+def fmt(ms):
+    return f"{ms:10.1f}" if ms is not None else f"{'failed':>10}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--against", default=None, help="git revision to compare with")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as other:
+        if args.against:
+            checkout(args.against, other)
+            print(f"{'entry point':<32} {args.against:>10} {'current':>10} {'saved':>10}   (ms, best of {args.runs})")
+        else:
+            print(f"{'entry point':<32} {'current':>10}   (ms, best of {args.runs})")
+        for module in args.modules:
+            current = import_ms(module, ROOT, args.runs)
+            if not args.against:
+                print(f"{module:<32} {fmt(current)}")
+                continue
+            before = import_ms(module, other, args.runs)
+            saved = before - current if before is not None and current is not None else None
+            print(f"{module:<32} {fmt(before)} {fmt(current)} {fmt(saved)}")
+
+
+if __name__ == "__main__":
+    main()
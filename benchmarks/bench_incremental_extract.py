@@ -0,0 +1,72 @@
+"""Chunks and model calls for full vs incremental extraction of a filing history.
+
+Builds a synthetic series of consecutive filings where each one edits a small
+share of the previous one's paragraphs, then extracts the series twice with the
+stub model: every filing in full, and incrementally. Offline:
+
+    python -m benchmarks.bench_incremental_extract --filings 4 --edit 0.05
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from benchmarks.stubs import StubExtractionModel
+from benchmarks.suite import STRUCTURED
+from DataExtraction.DataExtractor import DataExtractorAgent
+from DataExtraction.IncrementalExtractor import ExtractionHistory, IncrementalExtractor
+from tools.filing_index import FilingIndex
+from tools.fundamentals import FundamentalsStore
+
+
+def synthetic_history(filings, paragraphs, edit, seed=0):
+    rng = random.Random(seed)
+    lines = [f"Paragraph {j}: the company's segment {j % 9} results reflected demand, pricing "
+             f"and supply conditions described under risk factor {j % 40}." for j in range(paragraphs)]
+    history = []
+    for i in range(filings):
+        if i:
+            for j in rng.sample(range(paragraphs), int(paragraphs * edit)):
+                lines[j] = f"Paragraph {j} (revised in filing {i}): segment {j % 9} revenue was ${rng.randint(1, 900)} million."
+        history.append({"ticker": "SYN", "formtype": "10-K", "accession_number": f"0000000000-{20 + i}-000001",
+                        "filing_date": f"{2020 + i}-11-01", "text": "\n".join(lines)})
+    return history
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--filings", type=int, default=4)
+    parser.add_argument("--paragraphs", type=int, default=2000)
+    parser.add_argument("--edit", type=float, default=0.05, help="share of paragraphs edited per filing")
+    parser.add_argument("--llm-latency", type=float, default=0.01, help="seconds per stub model call")
+    args = parser.parse_args()
+
+    filings = synthetic_history(args.filings, args.paragraphs, args.edit)
+
+    llm = StubExtractionModel(latency=args.llm_latency, structured=STRUCTURED)
+    start = time.perf_counter()
+    for filing in filings:
+        DataExtractorAgent(llm, "get_sec_filings").extract(json.dumps(filing, separators=(",", ":")))
+    full_seconds, full_calls = time.perf_counter() - start, llm.calls
+
+    llm = StubExtractionModel(latency=args.llm_latency, structured=STRUCTURED)
+    extractor = IncrementalExtractor(llm, history=ExtractionHistory(), index=FilingIndex(":memory:"),
+                                     store=FundamentalsStore(tempfile.mkdtemp()))
+    start = time.perf_counter()
+    print(f"{'accession':<22} {'paragraphs':>10} {'changed':>8} {'chunks full':>11} {'sent':>6} {'reduction':>9}")
+    for filing in filings:
+        report = extractor.extract(filing)["report"]
+        print(f"{report['accession']:<22} {report['paragraphs']:>10} {report['changed_paragraphs']:>8} "
+              f"{report['chunks_full']:>11} {report['chunks_sent']:>6} {report['chunk_reduction']:>9.0%}")
+    incremental_seconds, incremental_calls = time.perf_counter() - start, llm.calls
+
+    print(f"\nfull:        {full_calls:>5} model calls  {full_seconds:7.2f}s")
+    print(f"incremental: {incremental_calls:>5} model calls  {incremental_seconds:7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
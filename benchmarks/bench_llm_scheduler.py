@@ -0,0 +1,91 @@
+"""Rate-limit errors and interactive latency under a background extraction load.
+
+A local stub endpoint enforces an RPM budget. A pool of threads floods it with
+background calls while a few interactive calls arrive mid-way, three ways:
+
+    unscheduled   every caller goes straight to the endpoint (no retries)
+    fifo          through the scheduler, everything at one priority
+    priority      through the scheduler, interactive calls marked interactive
+
+Offline:
+
+    python -m benchmarks.bench_llm_scheduler --rpm 600 --background 660
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from Agents.scheduler import LLMScheduler, priority, scheduled
+from benchmarks.stub_openai import StubOpenAI
+
+BACKGROUND_PROMPT = "Extract the figures from this chunk: " + "revenue grew in every segment. " * 60
+INTERACTIVE_PROMPT = "What is the DCF value of AAPL?"
+
+
+def run(mode, args):
+    from langchain_openai import ChatOpenAI
+    with StubOpenAI(rpm=args.rpm, latency=args.latency) as stub:
+        llm = ChatOpenAI(model="stub", base_url=stub.base_url, max_retries=0)
+        sched = None
+        if mode != "unscheduled":
+            sched = LLMScheduler(rpm=args.rpm)
+            scheduled(llm, sched)
+        errors = []
+
+        def call(prompt, level):
+            try:
+                with priority(level):
+                    llm.invoke(prompt)
+            except Exception as e:
+                errors.append(e)
+
+        latencies = []
+
+        def interactive():
+            level = "interactive" if mode == "priority" else "background"
+            for _ in range(args.interactive):
+                began = time.perf_counter()
+                call(INTERACTIVE_PROMPT, level)
+                latencies.append(time.perf_counter() - began)
+                time.sleep(args.interactive_gap)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            for _ in range(args.background):
+                pool.submit(call, BACKGROUND_PROMPT, "background")
+            timer = threading.Timer(args.interactive_after, interactive)
+            timer.start()
+            timer.join()
+            while len(latencies) < args.interactive:
+                time.sleep(0.05)
+        elapsed = time.perf_counter() - start
+
+    print(f"{mode:<12} {elapsed:7.1f}s  served {stub.served:>5}  429s {stub.rate_limited:>5}  "
+          f"failed calls {len(errors):>5}  interactive p50 {statistics.median(latencies) * 1000:8.0f} ms  "
+          f"max {max(latencies) * 1000:8.0f} ms")
+    if sched:
+        print(f"{'':<12} scheduler: {sched.stats()['by_priority']}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rpm", type=int, default=600)
+    parser.add_argument("--background", type=int, default=660)
+    parser.add_argument("--interactive", type=int, default=5)
+    parser.add_argument("--interactive-after", type=float, default=1.0)
+    parser.add_argument("--interactive-gap", type=float, default=0.3)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--modes", nargs="+", default=["unscheduled", "fifo", "priority"])
+    args = parser.parse_args()
+    for mode in args.modes:
+        run(mode, args)
+
+
+if __name__ == "__main__":
+    main()
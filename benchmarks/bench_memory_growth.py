@@ -0,0 +1,63 @@
+"""Per-turn prompt size of the replayed history over a long session.
+
+Compares langchain's ConversationBufferMemory with BoundedSummaryMemory on a
+synthetic session whose answers include large tool-style payloads. Offline:
+
+    python -m benchmarks.bench_memory_growth --turns 200
+
+Exits non-zero if the bounded memory ever exceeds its budget or keeps growing.
+"""
+import argparse
+import json
+import sys
+from langchain.memory import ConversationBufferMemory
+from Agents.memory import BoundedSummaryMemory, count_tokens
+
+
+def synthetic_turn(i):
+    query = f"Get the latest 10-K figures and news for ticker T{i % 37}"
+    payload = {"ticker": f"T{i % 37}", "revenue": f"${i * 1.7:.1f} billion",
+               "risk_factors": [f"risk {j} for turn {i}" for j in range(40)],
+               "text": "lorem ipsum dolor sit amet " * (50 + (i % 5) * 200)}
+    return query, json.dumps(payload)
+
+
+def history_tokens(messages):
+    return sum(count_tokens(m.content) for m in messages)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--max-tokens", type=int, default=2000)
+    parser.add_argument("--every", type=int, default=20)
+    args = parser.parse_args()
+
+    buffer = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
+    bounded = BoundedSummaryMemory(max_tokens=args.max_tokens)
+
+    print(f"{'turn':>5} {'buffer tokens':>14} {'bounded tokens':>15}")
+    bounded_sizes = []
+    for i in range(1, args.turns + 1):
+        query, answer = synthetic_turn(i)
+        for memory in (buffer, bounded):
+            memory.save_context({"input": query}, {"output": answer})
+        buffer_size = history_tokens(buffer.load_memory_variables({})["chat_history"])
+        bounded_size = history_tokens(bounded.load_memory_variables({})["chat_history"])
+        bounded_sizes.append(bounded_size)
+        if i % args.every == 0 or i == 1:
+            print(f"{i:>5} {buffer_size:>14,} {bounded_size:>15,}")
+
+    # allow for the summary header message on top of the budget
+    limit = args.max_tokens + 50
+    half = len(bounded_sizes) // 2
+    flat = max(bounded_sizes[half:]) <= max(bounded_sizes[:half]) + 50
+    if max(bounded_sizes) > limit or not flat:
+        print(f"FAIL: bounded memory peaked at {max(bounded_sizes)} tokens (limit {limit}), flat={flat}")
+        sys.exit(1)
+    print(f"OK: bounded memory peak {max(bounded_sizes)} tokens, "
+          f"{len(bounded.refs)} outputs stored out of band")
+
+
+if __name__ == "__main__":
+    main()
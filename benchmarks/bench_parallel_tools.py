@@ -0,0 +1,99 @@
+"""Sequential (functions API) vs parallel (tools API) agent tool execution.
+
+Uses a stub chat model and fake tools with artificial latency, so it runs offline:
+
+    python -m benchmarks.bench_parallel_tools --tool-latency 0.5 --llm-latency 0.3
+"""
+import argparse
+import asyncio
+import json
+import time
+from langchain_core.tools import tool
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.messages import AIMessage
+from Agents.parallel import build_executor
+from benchmarks.stubs import StubChatModel
+
+TOOL_LATENCY = 0.5
+
+
+@tool
+def fake_sec_filings(ticker: str) -> str:
+    """fake SEC filings lookup"""
+    time.sleep(TOOL_LATENCY)
+    return f"10-K for {ticker}"
+
+@tool
+def fake_news(ticker: str) -> str:
+    """fake news lookup"""
+    time.sleep(TOOL_LATENCY)
+    return f"news for {ticker}"
+
+@tool
+def fake_stock_info(ticker: str) -> str:
+    """fake stock info lookup"""
+    time.sleep(TOOL_LATENCY)
+    return f"stock info for {ticker}"
+
+@tool
+def fake_ratios(ticker: str) -> str:
+    """fake ratios lookup"""
+    time.sleep(TOOL_LATENCY)
+    return f"ratios for {ticker}"
+
+TOOLS = [fake_sec_filings, fake_news, fake_stock_info, fake_ratios]
+FINAL = AIMessage(content="AAPL looks fairly valued.")
+
+PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are a Data Collector for a Financial Analyst"),
+    MessagesPlaceholder(variable_name="chat_history"),
+    ("human", "{input}"),
+    MessagesPlaceholder(variable_name="agent_scratchpad")
+])
+
+
+def sequential_script():
+    """one function call per model turn, as the functions API does"""
+    turns = [AIMessage(content="", additional_kwargs={
+        "function_call": {"name": t.name, "arguments": json.dumps({"ticker": "AAPL"})}})
+        for t in TOOLS]
+    return turns + [FINAL]
+
+
+def parallel_script():
+    """every independent call requested in a single model turn"""
+    calls = [{"name": t.name, "args": {"ticker": "AAPL"}, "id": f"call_{i}"}
+             for i, t in enumerate(TOOLS)]
+    return [AIMessage(content="", tool_calls=calls), FINAL]
+
+
+def run(label, parallel_tools, script, llm_latency):
+    llm = StubChatModel(responses=script, latency=llm_latency)
+    executor = build_executor(llm, TOOLS, PROMPT, parallel_tools=parallel_tools, max_iterations=10)
+    inputs = {"input": "value AAPL", "chat_history": []}
+    start = time.perf_counter()
+    if parallel_tools:
+        result = asyncio.run(executor.ainvoke(inputs))
+    else:
+        result = executor.invoke(inputs)
+    elapsed = time.perf_counter() - start
+    assert result["output"] == FINAL.content
+    print(f"{label:<12} llm_calls={llm.calls}  wall={elapsed:6.2f}s")
+    return elapsed
+
+
+def main():
+    global TOOL_LATENCY
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tool-latency", type=float, default=0.5)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    args = parser.parse_args()
+    TOOL_LATENCY = args.tool_latency
+
+    sequential = run("sequential", False, sequential_script(), args.llm_latency)
+    parallel = run("parallel", True, parallel_script(), args.llm_latency)
+    print(f"speedup: {sequential / parallel:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Time to first result and model calls: blocking extract vs streaming with early stop.
+
+Extracts a synthetic filing with the stub model three ways: extract() (waits for
+every chunk), stream() read to the end, and stream(until=[...]) which stops once
+the requested fields are filled. Offline:
+
+    python -m benchmarks.bench_streaming_extract --llm-latency 0.05 --until revenue net_income
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from benchmarks.bench_filing_parse import synthetic_submission
+from benchmarks.stubs import StubExtractionModel
+from benchmarks.suite import STRUCTURED
+from DataExtraction.DataExtractor import DataExtractorAgent
+from tools.filing_parser import clean_filing_content
+
+
+def run(label, text, latency, until=None, stream=True):
+    llm = StubExtractionModel(latency=latency, structured=STRUCTURED)
+    agent = DataExtractorAgent(llm, "get_sec_filings")
+    start = time.perf_counter()
+    first = None
+    if stream:
+        for progress in agent.stream(text, until=until):
+            first = first or time.perf_counter() - start
+    else:
+        agent.extract(text)
+        first = time.perf_counter() - start
+    total = time.perf_counter() - start
+    print(f"{label:<22} first result {first:7.2f}s  total {total:7.2f}s  model calls {llm.calls:>4}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--paragraphs", type=int, default=300)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--until", nargs="+", default=["revenue", "net_income"])
+    args = parser.parse_args()
+
+    text = clean_filing_content(synthetic_submission(0, paragraphs=args.paragraphs))
+    run("extract()", text, args.llm_latency, stream=False)
+    run("stream()", text, args.llm_latency)
+    run(f"stream(until={len(args.until)})", text, args.llm_latency, until=args.until)
+
+
+if __name__ == "__main__":
+    main()
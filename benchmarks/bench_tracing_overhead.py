@@ -0,0 +1,47 @@
+"""Cost of an instrumented call site with tracing disabled vs enabled.
+
+    python -m benchmarks.bench_tracing_overhead --iterations 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+from Observability import tracing
+
+
+def per_call(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+def bare():
+    pass
+
+
+def instrumented():
+    with tracing.span("bench", attribute=1):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200000)
+    args = parser.parse_args()
+
+    tracing.disable()
+    baseline = per_call(bare, args.iterations)
+    disabled = per_call(instrumented, args.iterations)
+    print(f"bare call           {baseline:8.0f} ns")
+    print(f"span, disabled      {disabled:8.0f} ns  (+{disabled - baseline:.0f} ns)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tracing.enable(os.path.join(tmp, "trace.jsonl"))
+        enabled = per_call(instrumented, max(1, args.iterations // 20))
+        tracing.disable()
+    print(f"span, enabled       {enabled:8.0f} ns  (includes the JSONL write)")
+
+
+if __name__ == "__main__":
+    main()
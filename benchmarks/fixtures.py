@@ -0,0 +1,256 @@
+"""Recorded HTTP and yfinance fixtures for the offline benchmarks.
+
+Layout of a fixture directory:
+
+    http/index.json          url -> {"file", "status", "content_type"}
+    http/<n>.body            recorded response bodies
+    yfinance/<TICKER>.json   info, dividends and statements of a yfinance Ticker
+
+HTTP fixtures are served by a local server; tools.http_client.route_to() points
+the scrapers and SEC calls at it. yfinance keeps its own HTTP stack, so its
+recorded data is replayed through FixtureTicker instead.
+
+Record real fixtures (needs network):
+
+    python -m benchmarks.fixtures record benchmarks/fixtures_data AAPL MSFT
+
+or generate a synthetic set:
+
+    python -m benchmarks.fixtures synthetic benchmarks/fixtures_data AAPL MSFT
+"""
+import argparse
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+from benchmarks.bench_filing_parse import synthetic_submission
+
+
+class FixtureServer:
+    """serves http/index.json fixtures at http://127.0.0.1:<port>/<host>/<path>"""
+    def __init__(self, root):
+        with open(os.path.join(root, "http", "index.json"), encoding="utf-8") as f:
+            index = json.load(f)
+        bodies = {}
+        for url, entry in index.items():
+            with open(os.path.join(root, "http", entry["file"]), "rb") as f:
+                bodies[self._key(url)] = (entry["status"], entry.get("content_type", "text/html"), f.read())
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, content_type, body = bodies.get(self.path.lstrip("/"), (404, "text/plain", b"no fixture"))
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @staticmethod
+    def _key(url):
+        parts = urlsplit(url)
+        return f"{parts.netloc}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class HttpRecorder:
+    """collects live responses into an http/ fixture directory"""
+    def __init__(self, root):
+        self.dir = os.path.join(root, "http")
+        os.makedirs(self.dir, exist_ok=True)
+        self.index_path = os.path.join(self.dir, "index.json")
+        self.index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                self.index = json.load(f)
+        self._lock = threading.Lock()
+
+    def add(self, url, status, body: bytes, content_type="text/html"):
+        with self._lock:
+            name = self.index.get(url, {}).get("file") or f"{len(self.index)}.body"
+            with open(os.path.join(self.dir, name), "wb") as f:
+                f.write(body)
+            self.index[url] = {"file": name, "status": status, "content_type": content_type}
+
+    def __call__(self, url, response):
+        self.add(url, response.status_code, response.content,
+                 response.headers.get("Content-Type", "text/html"))
+
+    def save(self):
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=1)
+
+
+def _frame_to_json(frame):
+    return {str(column): {str(row): (None if pd.isna(v) else float(v)) for row, v in frame[column].items()}
+            for column in frame.columns}
+
+
+def _frame_from_json(data):
+    frame = pd.DataFrame(data)
+    frame.columns = pd.to_datetime(frame.columns)
+    return frame
+
+
+class FixtureTicker:
+    """stands in for yfinance.Ticker, replaying yfinance/<TICKER>.json.
+    Like yfinance, each endpoint is only loaded when it is read."""
+    root = None
+
+    def __init__(self, ticker):
+        self.ticker = ticker.upper()
+
+    def _data(self):
+        with open(os.path.join(self.root, "yfinance", f"{self.ticker}.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    @property
+    def info(self):
+        return self._data()["info"]
+
+    @property
+    def dividends(self):
+        return pd.Series({pd.Timestamp(k): v for k, v in self._data()["dividends"].items()}, dtype=float)
+
+    @property
+    def financials(self):
+        return _frame_from_json(self._data()["financials"])
+
+    @property
+    def balance_sheet(self):
+        return _frame_from_json(self._data()["balance_sheet"])
+
+    @property
+    def cashflow(self):
+        return _frame_from_json(self._data()["cashflow"])
+
+
+def record_yfinance(root, ticker):
+    import yfinance as yf
+    stock = yf.Ticker(ticker)
+    data = {"info": stock.info,
+            "dividends": {str(k): float(v) for k, v in stock.dividends.items()},
+            "financials": _frame_to_json(stock.financials),
+            "balance_sheet": _frame_to_json(stock.balance_sheet),
+            "cashflow": _frame_to_json(stock.cashflow)}
+    os.makedirs(os.path.join(root, "yfinance"), exist_ok=True)
+    with open(os.path.join(root, "yfinance", f"{ticker.upper()}.json"), "w", encoding="utf-8") as f:
+        json.dump(data, f, default=str)
+
+
+def record(root, tickers, formtype="10-K", amount=1):
+    """run the real fetch paths once with recording on"""
+    from tools import http_client
+    from tools.news_sentiment import collect_news
+    from tools.sec_filings import fetch_filings, get_cik
+
+    recorder = HttpRecorder(root)
+    http_client.record_with(recorder)
+    try:
+        for ticker in tickers:
+            cik = get_cik(ticker)
+            if cik:
+                fetch_filings(cik, ticker, formtype, amount)
+            collect_news(ticker)
+            record_yfinance(root, ticker)
+    finally:
+        http_client.record_with(None)
+        recorder.save()
+
+
+def _news_pages(symbol, n=8):
+    google = "".join(f"<div class='yY3Lee'><a class='z4rs2b' href='/n/{symbol}{i}'></a>"
+                     f"<div class='Yfwt5'>{symbol} headline {i} from Google</div>"
+                     f"<div class='sfyJob'>Wire</div><div class='Adak'>{i}h ago</div></div>" for i in range(n))
+    yahoo = "".join(f"<li class='stream-item'><a href='/news/{symbol}{i}'></a><h3>{symbol} headline {i} from Yahoo</h3>"
+                    f"<p>Shares of {symbol} moved as analysts weighed results.</p><time datetime='2024-01-0{i % 9 + 1}'></time></li>"
+                    for i in range(n))
+    seeking = "".join(f"<article><a href='/article/{symbol}{i}'></a><h3>{symbol} headline {i} from SA</h3>"
+                      f"<p>Valuation looks stretched.</p><time datetime='2024-01-0{i % 9 + 1}'></time></article>"
+                      for i in range(n))
+    marketwatch = "".join(f"<div class='article__content'><a href='/story/{symbol}{i}'></a><h3>{symbol} headline {i} from MW</h3>"
+                          f"<p>Market wrap.</p><span class='article__timestamp'>Jan {i + 1}</span></div>" for i in range(n))
+    wrap = lambda body: f"<html><body>{body}</body></html>".encode()
+    return {
+        f"https://www.google.com/finance/quote/{symbol}:NASDAQ": wrap(google),
+        f"https://finance.yahoo.com/quote/{symbol}/news": wrap(yahoo),
+        f"https://seekingalpha.com/symbol/{symbol}/news": wrap(seeking),
+        f"https://www.marketwatch.com/investing/stock/{symbol.lower()}": wrap(marketwatch),
+    }
+
+
+def _synthetic_yfinance(i):
+    dates = [f"202{d}-09-30" for d in range(4, 0, -1)]
+    rows = lambda names, scale: {date: {name: scale * (k + 1) * (1 + 0.05 * j) for k, name in enumerate(names)}
+                                 for j, date in enumerate(dates)}
+    return {"info": {"currentPrice": 100.0 + i, "previousClose": 99.0 + i, "trailingPE": 25.0, "forwardPE": 22.0,
+                     "priceToBook": 8.0, "beta": 1.1, "dividendRate": 1.0, "dividendYield": 0.01,
+                     "marketCap": 1e11 * (i + 1), "sharesOutstanding": 1e9 * (i + 1),
+                     "freeCashflow": 5e9 * (i + 1), "trailingEps": 4.0, "returnOnEquity": 0.3,
+                     "currentRatio": 1.2, "debtToEquity": 80.0, "sector": "Technology"},
+            "dividends": {f"202{y}-0{q}-15": 0.2 + 0.01 * (y * 4 + q) for y in range(1, 5) for q in (2, 5, 8)},
+            "financials": rows(["Total Revenue", "Net Income", "Operating Income"], 1e10),
+            "balance_sheet": rows(["Total Assets", "Total Liabilities Net Minority Interest"], 1e11),
+            "cashflow": rows(["Operating Cash Flow", "Capital Expenditure"], 1e9)}
+
+
+def synthetic(root, tickers, filings=2):
+    """deterministic stand-in fixtures shaped like the real responses"""
+    recorder = HttpRecorder(root)
+    company_tickers = {}
+    for i, ticker in enumerate(tickers):
+        cik = 1000 + i
+        company_tickers[str(i)] = {"cik_str": cik, "ticker": ticker, "title": f"{ticker} Inc."}
+        accessions = [f"0000{cik}-24-{n:06d}" for n in range(filings)]
+        submissions = {"filings": {"recent": {"form": ["10-K"] * filings,
+                                              "accessionNumber": accessions,
+                                              "filingDate": [f"202{4 - n}-11-01" for n in range(filings)]}}}
+        padded = str(cik).zfill(10)
+        recorder.add(f"https://data.sec.gov/submissions/CIK{padded}.json", 200,
+                     json.dumps(submissions).encode(), "application/json")
+        for n, accession in enumerate(accessions):
+            url = f"https://www.sec.gov/Archives/edgar/data/{padded}/{accession.replace('-', '')}/{accession}.txt"
+            recorder.add(url, 200, synthetic_submission(i * 10 + n).encode(), "text/plain")
+        for url, body in _news_pages(ticker).items():
+            recorder.add(url, 200, body)
+        os.makedirs(os.path.join(root, "yfinance"), exist_ok=True)
+        with open(os.path.join(root, "yfinance", f"{ticker}.json"), "w", encoding="utf-8") as f:
+            json.dump(_synthetic_yfinance(i), f)
+    recorder.add("https://www.sec.gov/files/company_tickers.json", 200,
+                 json.dumps(company_tickers).encode(), "application/json")
+    recorder.save()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("mode", choices=["record", "synthetic"])
+    parser.add_argument("root")
+    parser.add_argument("tickers", nargs="+")
+    args = parser.parse_args()
+    tickers = [t.upper() for t in args.tickers]
+    if args.mode == "record":
+        record(args.root, tickers)
+    else:
+        synthetic(args.root, tickers)
+    print(f"fixtures written to {args.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Load test for the analysis service (Service.server).
+
+Fires `--requests` POSTs from `--concurrency` threads and reports requests/sec
+and latency percentiles, plus the server's coalescing stats.
+
+    python -m Service.server --port 8765 &
+    python -m benchmarks.load_test --url http://127.0.0.1:8765 \\
+        --endpoint /tools/get_sec_filings --body '{"formtype": "10-K", "ticker": "AAPL", "amount": 1}'
+
+--offline starts an in-process server on benchmark fixtures and the stub model
+(see benchmarks.suite) so the run needs no network or API key.
+"""
+import argparse
+import contextlib
+import http.client
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+
+def post(url, endpoint, body):
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=600)
+    try:
+        connection.request("POST", endpoint, body=body, headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        response.read()
+        return response.status
+    finally:
+        connection.close()
+
+
+def get_json(url, endpoint):
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=60)
+    try:
+        connection.request("GET", endpoint)
+        return json.loads(connection.getresponse().read())
+    finally:
+        connection.close()
+
+
+def run_load(url, endpoint, body, requests, concurrency):
+    latencies, errors = [], []
+    lock = threading.Lock()
+    remaining = iter(range(requests))
+
+    def worker():
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            start = time.perf_counter()
+            try:
+                status = post(url, endpoint, body)
+            except Exception as e:
+                status = repr(e)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if status != 200:
+                    errors.append(status)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    print(f"{len(latencies)} requests, concurrency {concurrency}, {len(errors)} errors")
+    print(f"throughput {len(latencies) / wall:10.1f} req/s")
+    print(f"latency    p50 {cuts[49] * 1000:8.1f} ms   p95 {cuts[94] * 1000:8.1f} ms   "
+          f"p99 {cuts[98] * 1000:8.1f} ms   max {max(latencies) * 1000:8.1f} ms")
+    if errors:
+        print(f"first errors: {errors[:5]}")
+
+
+@contextlib.contextmanager
+def offline_server(llm_latency):
+    """in-process service wired to fixtures and the stub model, like benchmarks.suite"""
+    from Agents.llm import set_llm
+    from benchmarks.fixtures import FixtureServer, FixtureTicker, synthetic
+    from benchmarks.stubs import StubExtractionModel
+    from benchmarks.suite import STRUCTURED
+    import tools.sec_filings as sec_filings
+    import tools.market_data as market_data
+    from tools.filing_index import filing_index
+    from tools.fundamentals import fundamentals
+    from tools import http_client
+    from Service.server import AnalysisService, serve
+
+    with tempfile.TemporaryDirectory() as root:
+        synthetic(root, ["AAPL", "MSFT"])
+        with FixtureServer(root) as fixtures:
+            http_client.route_to(fixtures.url)
+            FixtureTicker.root = root
+            filing_index.path = os.path.join(root, "index.sqlite")
+            fundamentals.root = os.path.join(root, "fundamentals")
+            market_data.yf_ticker = FixtureTicker
+            sec_filings.SEC_REQUEST_DELAY = 0
+            set_llm(StubExtractionModel(latency=llm_latency, structured=STRUCTURED))
+            server = serve(AnalysisService(), port=0)
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                yield f"http://127.0.0.1:{server.server_address[1]}"
+            finally:
+                server.shutdown()
+                server.server_close()
+                http_client.route_to(None)
+                filing_index.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--endpoint", default="/tools/get_sec_filings")
+    parser.add_argument("--body", default='{"formtype": "10-K", "ticker": "AAPL", "amount": 1}')
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--offline", action="store_true")
+    parser.add_argument("--llm-latency", type=float, default=0.02, help="stub model latency with --offline")
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        url = stack.enter_context(offline_server(args.llm_latency)) if args.offline else args.url
+        run_load(url, args.endpoint, args.body, args.requests, args.concurrency)
+        tool = args.endpoint.rsplit("/", 1)[-1]
+        stats = get_json(url, "/stats")
+        if tool in stats:
+            print(f"server stats for {tool}: {stats[tool]}")
+
+
+if __name__ == "__main__":
+    main()
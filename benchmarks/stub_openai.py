@@ -0,0 +1,190 @@
+"""A local OpenAI-compatible endpoint that enforces rate limits, for offline tests
+of the LLM scheduler and batch extraction.
+
+Implements just enough of the API for ChatOpenAI and the OpenAI SDK:
+
+    POST /v1/chat/completions     429 + Retry-After once over its RPM/TPM budget
+    POST /v1/files                multipart upload (batch input)
+    GET  /v1/files/<id>/content
+    POST /v1/batches              runs the whole batch at once, outside the live limits
+    GET  /v1/batches/<id>
+
+Point a client at it with base_url=stub.base_url (or OPENAI_BASE_URL).
+Structured-output requests (response_format json_schema) are answered with the
+`structured` values that belong to the requested schema; other requests with "ok".
+"""
+import email.parser
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128   # set before listen(); bursts of concurrent clients are the point
+
+
+class _Budget:
+    """provider-side limiter: `per_minute` units replenished continuously"""
+    def __init__(self, per_minute):
+        self.per_minute = per_minute
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def try_take(self, amount):
+        now = time.monotonic()
+        self.level = min(self.per_minute, self.level + (now - self.updated) * self.per_minute / 60.0)
+        self.updated = now
+        if amount > self.level:
+            return (amount - self.level) * 60.0 / self.per_minute
+        self.level -= amount
+        return 0.0
+
+
+def _prompt_tokens(body):
+    return sum(len(str(message.get("content") or "")) for message in body.get("messages", [])) // 4
+
+
+class StubOpenAI:
+    def __init__(self, rpm=None, tpm=None, latency=0.0, structured=None, completion_tokens=20):
+        self.latency = latency
+        self.structured = structured or {}
+        self.completion_tokens = completion_tokens
+        self.requests = _Budget(rpm) if rpm else None
+        self.tokens = _Budget(tpm) if tpm else None
+        self.served = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.files = {}
+        self.batches = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, status, payload, headers=None):
+                body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self):
+                return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+            def do_POST(self):
+                raw = self._body()
+                if self.path == "/v1/chat/completions":
+                    status, payload, headers = stub.chat(json.loads(raw))
+                    self._reply(status, payload, headers)
+                elif self.path == "/v1/files":
+                    self._reply(200, stub.upload(self.headers.get("Content-Type"), raw))
+                elif self.path == "/v1/batches":
+                    self._reply(200, stub.run_batch(json.loads(raw)))
+                else:
+                    self._reply(404, {"error": {"message": f"Unknown endpoint {self.path}"}})
+
+            def do_GET(self):
+                parts = self.path.strip("/").split("/")
+                if parts[:2] == ["v1", "batches"] and len(parts) == 3 and parts[2] in stub.batches:
+                    self._reply(200, stub.batches[parts[2]])
+                elif parts[:2] == ["v1", "files"] and len(parts) == 4 and parts[2] in stub.files:
+                    self._reply(200, stub.files[parts[2]]["content"])
+                else:
+                    self._reply(404, {"error": {"message": f"Unknown endpoint {self.path}"}})
+
+            def log_message(self, *args):
+                pass
+
+        self.server = _Server(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.base_url = f"{self.url}/v1"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def _new_id(self, prefix):
+        return f"{prefix}_{next(self._ids)}"
+
+    def completion(self, body):
+        content = "ok"
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            fields = response_format["json_schema"].get("schema", {}).get("properties", {})
+            content = json.dumps({k: v for k, v in self.structured.items() if k in fields})
+        prompt = _prompt_tokens(body)
+        return {"id": self._new_id("chatcmpl"), "object": "chat.completion", "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": prompt, "completion_tokens": self.completion_tokens,
+                          "total_tokens": prompt + self.completion_tokens}}
+
+    def chat(self, body):
+        tokens = _prompt_tokens(body) + self.completion_tokens
+        with self._lock:
+            wait = 0.0
+            if self.requests:
+                wait = self.requests.try_take(1)
+            if not wait and self.tokens:
+                wait = self.tokens.try_take(tokens)
+                if wait and self.requests:
+                    self.requests.level += 1   # refund: the request was refused
+            if wait:
+                self.rate_limited += 1
+                return 429, {"error": {"message": "Rate limit reached", "type": "requests",
+                                       "code": "rate_limit_exceeded"}}, {"Retry-After": f"{wait:.3f}"}
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+            self.served += 1
+        return 200, self.completion(body), {}
+
+    def upload(self, content_type, raw):
+        message = email.parser.BytesParser().parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode() + raw)
+        content = b""
+        for part in message.get_payload():
+            if part.get_param("name", header="content-disposition") == "file":
+                content = part.get_payload(decode=True)
+        file_id = self._new_id("file")
+        self.files[file_id] = {"content": content}
+        return {"id": file_id, "object": "file", "bytes": len(content), "created_at": int(time.time()),
+                "filename": "input.jsonl", "purpose": "batch", "status": "processed"}
+
+    def run_batch(self, request):
+        """batches skip the live limits, as on the real API, and finish immediately"""
+        lines = []
+        for line in self.files[request["input_file_id"]]["content"].decode().splitlines():
+            if line.strip():
+                item = json.loads(line)
+                lines.append(json.dumps({"id": self._new_id("batch_req"), "custom_id": item["custom_id"],
+                                         "response": {"status_code": 200, "body": self.completion(item["body"])},
+                                         "error": None}))
+        output_id = self._new_id("file")
+        self.files[output_id] = {"content": "\n".join(lines).encode()}
+        batch_id = self._new_id("batch")
+        now = int(time.time())
+        self.batches[batch_id] = {"id": batch_id, "object": "batch", "endpoint": request["endpoint"],
+                                  "input_file_id": request["input_file_id"], "output_file_id": output_id,
+                                  "completion_window": request["completion_window"], "status": "completed",
+                                  "created_at": now, "completed_at": now,
+                                  "request_counts": {"total": len(lines), "completed": len(lines), "failed": 0},
+                                  "metadata": request.get("metadata")}
+        return self.batches[batch_id]
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
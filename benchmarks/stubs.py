@@ -0,0 +1,43 @@
+"""Deterministic stand-ins used by the offline benchmarks."""
+import time
+from typing import List
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+
+class StubChatModel(BaseChatModel):
+    """chat model that replays scripted replies after a fixed latency.
+
+    Replies are returned in order; the last one repeats once the script runs out.
+    """
+    responses: List[AIMessage]
+    latency: float = 0.0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-chat"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency)
+        message = self.responses[min(self.calls, len(self.responses) - 1)]
+        self.calls += 1
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class StubExtractionModel(StubChatModel):
+    """stub for DataExtractorAgent: with_structured_output returns the same
+    schema instance (built from `structured`) after `latency`."""
+    responses: List[AIMessage] = [AIMessage(content="")]
+    structured: dict = {}
+
+    def with_structured_output(self, schema, **kwargs):
+        values = {k: v for k, v in self.structured.items() if k in schema.model_fields}
+
+        def respond(prompt):
+            time.sleep(self.latency)
+            self.calls += 1
+            return schema.model_validate(values)
+        return RunnableLambda(respond)
@@ -0,0 +1,198 @@
+"""Offline, reproducible benchmark suite.
+
+Every case runs against recorded HTTP fixtures served from localhost, replayed
+yfinance data and a deterministic stub chat model, so numbers only move when the
+code does. Reports throughput, p50/p95/p99 latency and peak traced memory, and
+compares them with a stored baseline.
+
+    python -m benchmarks.suite                       # run and compare with benchmarks/baseline.json
+    python -m benchmarks.suite --save-baseline       # refresh the baseline
+    python -m benchmarks.suite --check               # exit 1 on a regression beyond --tolerance
+    python -m benchmarks.suite --fixtures DIR        # use recorded fixtures (see benchmarks.fixtures)
+
+Without --fixtures, a synthetic fixture set is generated in a temp directory.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+import tools.sec_filings as sec_filings
+import tools.market_data as market_data
+import tools.stock_data as stock_data
+from benchmarks.bench_fundamentals import synthetic_extraction
+from benchmarks.fixtures import FixtureServer, FixtureTicker, synthetic
+from Agents.llm import set_llm
+from benchmarks.stubs import StubExtractionModel
+from DataExtraction.DataExtractor import DataExtractorAgent
+from DataExtraction.IncrementalExtractor import extraction_history
+from tools import http_client
+from tools.artifacts import artifacts
+from tools.filing_index import filing_index
+from tools.fundamentals import fundamentals
+from tools.news_sentiment import get_all_news
+from tools.valuation_tools import calculate_comparable_valuation, calculate_dcf, calculate_ddm
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+TICKER = "AAPL"
+STRUCTURED = {"revenue": "$391.0 billion", "net_income": "$93.7 billion", "free_cash_flow": "$108.8 billion",
+              "sentiment_label": "neutral", "sentiment_score": 0.1, "form_type": "10-K", "company_name": "Apple Inc."}
+
+
+def measure(fn, iterations, warmup=1):
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        began = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - began)
+    total = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {"iterations": iterations,
+            "ops_per_s": round(iterations / total, 2),
+            "p50_ms": round(cuts[49] * 1000, 3),
+            "p95_ms": round(cuts[94] * 1000, 3),
+            "p99_ms": round(cuts[98] * 1000, 3),
+            "peak_kb": round(peak / 1024, 1)}
+
+
+def cases(llm):
+    cik = sec_filings.get_cik(TICKER)
+    filing = sec_filings.get_filing_urls(cik, "10-K", 1)[0]
+    filing_text = sec_filings.download_filing_text(filing, cik)
+    filing_index.add(TICKER, "10-K", filing["accession"], filing["filing_date"], filing_text)
+    rng = random.Random(0)
+    universe = [f"T{i:03d}" for i in range(100)]
+    for ticker in universe:
+        for year in range(2020, 2025):
+            fundamentals.add(ticker, "10-K", f"{year}-11-01", synthetic_extraction(rng, year))
+    fundamentals.compact()
+
+    def fresh(fn):
+        # tools reuse stored artifacts, cached market data and past extractions;
+        # clear them so every iteration does the work
+        def run():
+            artifacts.clear()
+            market_data.market_data.clear()
+            extraction_history.clear()
+            return fn()
+        return run
+
+    return {
+        "download_filing_text": (lambda: sec_filings.download_filing_text(filing, cik), 20),
+        "get_sec_filings": (fresh(lambda: sec_filings.get_sec_filings.invoke(
+            {"formtype": "10-K", "ticker": TICKER, "amount": 2})), 5),
+        "get_all_news": (fresh(lambda: get_all_news.invoke({"symbol": TICKER})), 20),
+        "get_complete_stock_info": (fresh(lambda: stock_data.get_complete_stock_info.invoke({"ticker": TICKER})), 50),
+        "search_filings": (lambda: filing_index.search("revenue growth by segment", ticker=TICKER, k=5), 200),
+        "fundamentals_history": (lambda: fundamentals.history("free_cash_flow", universe, periods=5), 50),
+        "extract": (lambda: DataExtractorAgent(llm, "get_sec_filings").extract(filing_text), 5),
+        "valuation_tools": (lambda: (
+            calculate_dcf.invoke({"discount_rate": 0.09, "cash_flows": [100.0, 110.0, 121.0, 133.1, 146.4]}),
+            calculate_ddm.invoke({"discount_rate": 0.09, "dividend_next_year": 1.0, "growth_rate": 0.04}),
+            calculate_comparable_valuation.invoke({"peer_avg_multiple": 25.0, "company_metric": 6.1})), 500),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """returns the list of regressions beyond tolerance"""
+    regressions = []
+    print(f"\n{'case':<26} {'ops/s':>16} {'p50 ms':>18} {'peak KB':>18}")
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            print(f"{name:<26} (no baseline)")
+            continue
+        deltas = {
+            "ops_per_s": current["ops_per_s"] / base["ops_per_s"] - 1,
+            "p50_ms": current["p50_ms"] / base["p50_ms"] - 1 if base["p50_ms"] else 0,
+            "peak_kb": current["peak_kb"] / base["peak_kb"] - 1 if base["peak_kb"] else 0,
+        }
+        print(f"{name:<26} {current['ops_per_s']:>9.1f} ({deltas['ops_per_s']:+5.0%}) "
+              f"{current['p50_ms']:>10.2f} ({deltas['p50_ms']:+5.0%}) {current['peak_kb']:>10.0f} ({deltas['peak_kb']:+5.0%})")
+        if deltas["ops_per_s"] < -tolerance:
+            regressions.append(f"{name}: throughput {deltas['ops_per_s']:+.0%}")
+        if deltas["p50_ms"] > tolerance:
+            regressions.append(f"{name}: p50 latency {deltas['p50_ms']:+.0%}")
+        if deltas["peak_kb"] > tolerance:
+            regressions.append(f"{name}: peak memory {deltas['peak_kb']:+.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", default=None)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="seconds per stub model call")
+    parser.add_argument("--only", nargs="+", default=None, help="run only these cases")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        root = args.fixtures
+        if root is None:
+            root = stack.enter_context(tempfile.TemporaryDirectory())
+            synthetic(root, [TICKER, "MSFT"])
+        server = stack.enter_context(FixtureServer(root))
+
+        # offline wiring: fixtures for HTTP and yfinance, the stub for every extraction call
+        http_client.route_to(server.url)
+        stack.callback(http_client.route_to, None)
+        FixtureTicker.root = root
+        # keep the filing index and fundamentals store out of the working directory and the fixtures
+        filing_index.path = os.path.join(stack.enter_context(tempfile.TemporaryDirectory()), "index.sqlite")
+        stack.callback(filing_index.close)
+        fundamentals.root = stack.enter_context(tempfile.TemporaryDirectory())
+        market_data.yf_ticker = FixtureTicker
+        llm = StubExtractionModel(latency=args.llm_latency, structured=STRUCTURED)
+        set_llm(llm)
+        sec_filings.SEC_REQUEST_DELAY = 0
+
+        results = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            selected = cases(llm)
+        for name, (fn, iterations) in selected.items():
+            if args.only and name not in args.only:
+                continue
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[name] = measure(fn, iterations)
+            r = results[name]
+            print(f"{name:<26} {r['ops_per_s']:>10.1f} ops/s  p50 {r['p50_ms']:>9.2f} ms  "
+                  f"p95 {r['p95_ms']:>9.2f} ms  p99 {r['p99_ms']:>9.2f} ms  peak {r['peak_kb']:>9.0f} KB")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\nbaseline saved to {args.baseline}")
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nregressions:\n  " + "\n  ".join(regressions))
+            if args.check:
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+from langchain_core.tools import tool
+
+HANDLE_PREFIX = "artifact://"
+
+
+class ArtifactStore:
+    """keeps large tool payloads out of the LLM context.
+
+    Tools put their full results here and hand the agent a short handle plus a
+    summary; valuation tools and read_artifact resolve the handle back to the data,
+    so a payload is never tokenized twice. Artifacts are also indexed by
+    (kind, key), letting a repeated request reuse a recent payload instead of
+    refetching it. With a root directory, artifacts are also written to disk as JSON.
+
+    Memory is bounded: past max_items the least recently used artifacts are dropped,
+    and artifacts older than max_age are dropped when next looked up. Dropped
+    artifacts stay readable from disk when there is a root directory. Pinned
+    artifacts (a conversation's offloaded messages) are outside both bounds and
+    live until their owner discards them.
+    """
+    def __init__(self, root: Optional[str] = None, max_items: int = 256, max_age: float = 24 * 3600):
+        self.root = root
+        self.max_items = max_items
+        self.max_age = max_age
+        self.items = OrderedDict()   # handle -> (kind, key, created, payload), least recently used first
+        self.pinned = {}             # handle -> (kind, key, created, payload), kept until discard()
+        self.index = {}   # (kind, key) -> handle
+        self._lock = threading.Lock()
+        if root:
+            os.makedirs(root, exist_ok=True)
+
+    def put(self, kind: str, payload, key: Optional[str] = None, pinned: bool = False) -> str:
+        handle = f"{HANDLE_PREFIX}{kind}/{uuid.uuid4().hex[:12]}"
+        with self._lock:
+            (self.pinned if pinned else self.items)[handle] = (kind, key, time.time(), payload)
+            if key is not None:
+                self.index[(kind, key)] = handle
+            while len(self.items) > self.max_items:
+                self._drop(next(iter(self.items)))
+        if self.root:
+            with open(self._path(handle), "w", encoding="utf-8") as f:
+                json.dump({"kind": kind, "key": key, "payload": to_jsonable(payload)}, f)
+        return handle
+
+    def get(self, handle: str):
+        """payload behind a handle, or None if unknown"""
+        with self._lock:
+            item = self._live(handle)
+        if item is not None:
+            return item[3]
+        if self.root and handle.startswith(HANDLE_PREFIX) and os.path.exists(self._path(handle)):
+            with open(self._path(handle), encoding="utf-8") as f:
+                return json.load(f)["payload"]
+        return None
+
+    def exists(self, handle: str) -> bool:
+        """whether get() would still return the handle's payload"""
+        with self._lock:
+            if self._live(handle) is not None:
+                return True
+        return bool(self.root) and handle.startswith(HANDLE_PREFIX) and os.path.exists(self._path(handle))
+
+    def find(self, kind: str, key: str, max_age: Optional[float] = None) -> Optional[str]:
+        """handle of the latest artifact stored under (kind, key), if fresh enough"""
+        with self._lock:
+            handle = self.index.get((kind, key))
+            item = self._live(handle) if handle is not None else None
+            if item is None:
+                return None
+            created = item[2]
+        if max_age is not None and time.time() - created > max_age:
+            return None
+        return handle
+
+    def discard(self, handle: str):
+        """forget one in-memory artifact, pinned or not"""
+        with self._lock:
+            if handle in self.pinned:
+                kind, key, _, _ = self.pinned.pop(handle)
+                if self.index.get((kind, key)) == handle:
+                    del self.index[(kind, key)]
+            elif handle in self.items:
+                self._drop(handle)
+
+    def clear(self):
+        """forget every in-memory artifact (files under root are kept)"""
+        with self._lock:
+            self.items.clear()
+            self.pinned.clear()
+            self.index.clear()
+
+    def _live(self, handle):
+        """item behind a handle, marked as recently used; expired items are dropped"""
+        if handle in self.pinned:
+            return self.pinned[handle]
+        item = self.items.get(handle)
+        if item is None:
+            return None
+        if time.time() - item[2] > self.max_age:
+            self._drop(handle)
+            return None
+        self.items.move_to_end(handle)
+        return item
+
+    def _drop(self, handle):
+        kind, key, _, _ = self.items.pop(handle)
+        if self.index.get((kind, key)) == handle:
+            del self.index[(kind, key)]
+
+    def _path(self, handle):
+        return os.path.join(self.root, handle[len(HANDLE_PREFIX):].replace("/", "_") + ".json")
+
+
+artifacts = ArtifactStore(os.environ.get("ARTIFACT_DIR"))
+
+
+def to_jsonable(value):
+    """converts pandas/numpy-laden payloads (Timestamp keys, numpy scalars) to plain JSON types"""
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        try:
+            value = value.item()
+        except Exception:
+            pass
+    if isinstance(value, float) and value != value:
+        return None
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def is_handle(value) -> bool:
+    return isinstance(value, str) and value.startswith(HANDLE_PREFIX)
+
+
+def artifact_reply(handle: str, summary: dict) -> dict:
+    """compact tool result pointing at a stored artifact"""
+    return {"artifact": handle,
+            "summary": summary,
+            "note": "Full data is stored out of band. Pass the artifact handle to the valuation "
+                    "tools, or use read_artifact to look up specific fields."}
+
+
+@tool
+def read_artifact(handle: str, fields: Optional[list[str]] = None) -> dict:
+    """Read stored data behind an artifact handle returned by another tool.
+
+    Args:
+        handle: the artifact handle (e.g. 'artifact://stock_info/1a2b3c4d5e6f')
+        fields: only return these top-level fields (recommended, payloads can be large)
+    """
+    payload = artifacts.get(handle)
+    if payload is None:
+        return {"error": f"Unknown artifact {handle}"}
+    if fields and isinstance(payload, dict):
+        return {field: payload.get(field) for field in fields}
+    if isinstance(payload, str):
+        return {"data": payload[:4000], "truncated": len(payload) > 4000}
+    text = json.dumps(payload, default=str)
+    if len(text) > 4000:
+        return {"error": "Artifact too large to read whole; request specific fields",
+                "available_fields": list(payload) if isinstance(payload, dict) else None}
+    return payload if isinstance(payload, dict) else {"data": payload}
@@ -0,0 +1,97 @@
+import threading
+import time
+
+
+class SingleFlight:
+    """collapses concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it is in
+    flight wait and receive the same result (or exception).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}   # key -> [event, result, error]
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = [threading.Event(), None, None]
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call[0].wait()
+            if call[2] is not None:
+                raise call[2]
+            return call[1]
+
+        try:
+            call[1] = fn()
+            return call[1]
+        except Exception as e:
+            call[2] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call[0].set()
+
+
+class TTLCache:
+    """thread-safe dict whose entries expire after `ttl` seconds"""
+    def __init__(self, ttl, max_entries=1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._items = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and time.monotonic() - item[0] < self.ttl:
+                self.hits += 1
+                return True, item[1]
+            self._items.pop(key, None)
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        with self._lock:
+            if len(self._items) >= self.max_entries:
+                # drop the oldest entry
+                oldest = min(self._items, key=lambda k: self._items[k][0])
+                del self._items[oldest]
+            self._items[key] = (time.monotonic(), value)
+
+
+class Coalescer:
+    """TTL cache in front of a SingleFlight: fresh results are served from memory,
+    and concurrent misses for the same key share one fetch"""
+    def __init__(self, ttl):
+        self.cache = TTLCache(ttl)
+        self.flight = SingleFlight()
+
+    def get(self, key, fn, cache_if=lambda value: True, reuse_if=lambda value: True):
+        """cached value for key, or fn()'s. cache_if decides what is stored; reuse_if
+        can turn down a cached value that is no longer usable, which is then refetched"""
+        found, value = self.cache.get(key)
+        if found and reuse_if(value):
+            return value
+
+        def fetch():
+            value = fn()
+            if cache_if(value):
+                self.cache.put(key, value)
+            return value
+        return self.flight.do(key, fetch)
+
+    def stats(self):
+        return {"cache_hits": self.cache.hits, "cache_misses": self.cache.misses,
+                "executed": self.flight.executed, "coalesced": self.flight.coalesced}
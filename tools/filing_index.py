@@ -0,0 +1,201 @@
+"""Local full-text index over cleaned filing text.
+
+Every filing that passes through fetch_filings or the bulk ingester is split into
+passages and added to a SQLite FTS5 table on disk, keyed by accession number, so
+indexing is incremental and a filing is never indexed twice. search_filings ranks
+passages with BM25 and returns only the top few, which lets the agent look up a
+specific fact without re-downloading and re-extracting a whole document.
+
+    python -m tools.filing_index AAPL "revenue by segment" -k 5
+"""
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+from langchain_core.tools import tool
+from Observability.tracing import span
+
+PASSAGE_CHARS = 1200
+DEFAULT_PATH = "filing_index.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS filings (
+    accession TEXT PRIMARY KEY,
+    ticker TEXT NOT NULL,
+    formtype TEXT,
+    filing_date TEXT,
+    passages INTEGER,
+    indexed_at REAL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS passages USING fts5(
+    text,
+    ticker UNINDEXED,
+    formtype UNINDEXED,
+    accession UNINDEXED,
+    filing_date UNINDEXED,
+    position UNINDEXED,
+    tokenize = 'porter unicode61'
+);
+"""
+
+
+def split_passages(text: str, size: int = PASSAGE_CHARS) -> List[str]:
+    """pack the cleaned filing's lines into passages of about `size` characters"""
+    passages, current, length = [], [], 0
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if current and length + len(line) > size:
+            passages.append("\n".join(current))
+            current, length = [], 0
+        current.append(line)
+        length += len(line) + 1
+    if current:
+        passages.append("\n".join(current))
+    return passages
+
+
+def match_expression(query: str) -> str:
+    """free text -> an FTS5 OR query, so punctuation never becomes query syntax"""
+    terms = dict.fromkeys(re.findall(r"\w+", query.lower()))
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+class FilingIndex:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.environ.get("FILING_INDEX", DEFAULT_PATH)
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self):
+        # opened on first use so importing the tools never touches the disk
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def has(self, accession: str) -> bool:
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM filings WHERE accession = ?",
+                                     (accession,)).fetchone() is not None
+
+    def add(self, ticker, formtype, accession, filing_date, text) -> int:
+        """index one cleaned filing; returns the passages added (0 if already indexed)"""
+        if not text or text.startswith(("Error downloading filing", "Error parsing filing")):
+            return 0
+        ticker = ticker.upper()
+        passages = split_passages(text)
+        with self._lock, span("filing_index.add", accession=accession, passages=len(passages)):
+            conn = self.conn
+            with conn:
+                inserted = conn.execute(
+                    "INSERT OR IGNORE INTO filings VALUES (?, ?, ?, ?, ?, ?)",
+                    (accession, ticker, formtype, filing_date, len(passages), time.time())).rowcount
+                if not inserted:
+                    return 0
+                conn.executemany(
+                    "INSERT INTO passages VALUES (?, ?, ?, ?, ?, ?)",
+                    [(passage, ticker, formtype, accession, filing_date, i)
+                     for i, passage in enumerate(passages)])
+        return len(passages)
+
+    def filings(self, ticker: str, formtype: Optional[str] = None) -> List[dict]:
+        sql = "SELECT accession, formtype, filing_date, passages FROM filings WHERE ticker = ?"
+        params = [ticker.upper()]
+        if formtype:
+            sql += " AND formtype = ?"
+            params.append(formtype)
+        with self._lock:
+            rows = self.conn.execute(sql + " ORDER BY filing_date DESC", params).fetchall()
+        return [dict(zip(["accession", "formtype", "filing_date", "passages"], row)) for row in rows]
+
+    def text(self, accession: str) -> Optional[str]:
+        """the indexed text of one filing, rebuilt from its passages"""
+        with self._lock:
+            rows = self.conn.execute("SELECT text FROM passages WHERE accession = ? ORDER BY CAST(position AS INTEGER)",
+                                     (accession,)).fetchall()
+        return "\n".join(row[0] for row in rows) if rows else None
+
+    def search(self, query: str, ticker: Optional[str] = None, formtype: Optional[str] = None,
+               k: int = 5) -> List[dict]:
+        """top-k passages by BM25 (lower bm25() is better; scores are returned negated)"""
+        expression = match_expression(query)
+        if not expression:
+            return []
+        sql = ("SELECT text, ticker, formtype, accession, filing_date, position, bm25(passages) AS rank "
+               "FROM passages WHERE passages MATCH ?")
+        params = [expression]
+        if ticker:
+            sql += " AND ticker = ?"
+            params.append(ticker.upper())
+        if formtype:
+            sql += " AND formtype = ?"
+            params.append(formtype)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(k)
+        with self._lock, span("filing_index.search", ticker=ticker, k=k):
+            rows = self.conn.execute(sql, params).fetchall()
+        return [{"ticker": row[1], "formtype": row[2], "accession": row[3], "filing_date": row[4],
+                 "position": row[5], "score": round(-row[6], 3), "text": row[0]} for row in rows]
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+filing_index = FilingIndex()
+
+
+@tool
+def search_filings(ticker: str, query: str, k: int = 5, formtype: str = "10-K") -> dict:
+    """Find the passages of a company's SEC filings most relevant to a question
+    (e.g. "revenue by segment", "supply chain risks"). Much cheaper than get_sec_filings
+    when you need one specific fact; returns only the top k passages.
+    If nothing is indexed for the ticker yet, its latest filing is downloaded and indexed first.
+    """
+    if not filing_index.filings(ticker, formtype):
+        from tools.sec_filings import fetch_filings, get_cik
+        cik = get_cik(ticker)
+        if not cik:
+            return {"error": f"Could not find CIK for ticker {ticker}"}
+        fetch_filings(cik, ticker.upper(), formtype, 1)   # indexes as it downloads
+    passages = filing_index.search(query, ticker=ticker, formtype=formtype, k=k)
+    if not passages:
+        return {"error": f"No indexed {formtype} passages for {ticker} match '{query}'"}
+    return {"ticker": ticker.upper(), "query": query, "passages": passages}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("ticker")
+    parser.add_argument("query")
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--formtype", default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    passages = filing_index.search(args.query, ticker=args.ticker, formtype=args.formtype, k=args.k)
+    elapsed = (time.perf_counter() - start) * 1000
+    for passage in passages:
+        print(f"[{passage['score']:.2f}] {passage['formtype']} {passage['filing_date']} "
+              f"{passage['accession']} #{passage['position']}")
+        print(passage["text"][:400].replace("\n", " "))
+        print()
+    print(f"{len(passages)} passages in {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Bulk filing ingestion with downloads and HTML cleaning decoupled.
+
+Downloader threads stream raw EDGAR submissions into a bounded queue; a process
+pool sized to the machine's cores turns them into clean text. The bounded queue
+gives backpressure, so memory stays flat however many filings are queued.
+
+    python -m tools.filing_ingest AAPL MSFT --formtype 10-K --amount 3 --raw-dir corpus --out-dir cleaned
+"""
+import argparse
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from tools.filing_index import filing_index
+from tools.filing_parser import clean_filing_content
+from tools.sec_filings import download_filing_raw, get_cik, get_filing_urls
+
+_DONE = object()
+
+
+def _download_worker(jobs, raw_queue, raw_dir, delay):
+    while True:
+        try:
+            filing, cik = jobs.get_nowait()
+        except queue.Empty:
+            break
+        try:
+            content = download_filing_raw(filing, cik)
+            if raw_dir:
+                with open(os.path.join(raw_dir, f"{cik}_{filing['accession']}.txt"), "w", encoding="utf-8") as f:
+                    f.write(content)
+            raw_queue.put((filing, cik, content, None))
+        except Exception as e:
+            raw_queue.put((filing, cik, None, f"Error downloading filing: {str(e)}"))
+        time.sleep(delay)   # stay under SEC's request rate
+    raw_queue.put(_DONE)
+
+
+def ingest_filings(jobs, workers=None, queue_size=None, download_threads=2, raw_dir=None, delay=0.2):
+    """Download and clean many filings, yielding results as each one finishes parsing.
+
+    Args:
+        jobs: iterable of (filing, cik) pairs, filing as returned by get_filing_urls
+        workers: parsing processes (default: available cores)
+        queue_size: raw documents buffered between downloaders and parsers (default: 2 * workers)
+        download_threads: concurrent downloaders
+        raw_dir: also save every raw submission here (builds a corpus for benchmarks)
+
+    Yields:
+        dicts with filing, cik and text (or an error message in text, like download_filing_text)
+    """
+    workers = workers or available_cores()
+    queue_size = queue_size or 2 * workers
+    if raw_dir:
+        os.makedirs(raw_dir, exist_ok=True)
+
+    job_queue = queue.Queue()
+    for job in jobs:
+        job_queue.put(job)
+    raw_queue = queue.Queue(maxsize=queue_size)
+    downloaders = [threading.Thread(target=_download_worker, args=(job_queue, raw_queue, raw_dir, delay),
+                                    daemon=True) for _ in range(download_threads)]
+    for thread in downloaders:
+        thread.start()
+
+    finished = 0
+    pending = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while finished < len(downloaders) or pending:
+            # keep at most queue_size documents inside the pool as well
+            can_accept = finished < len(downloaders) and len(pending) < queue_size
+            if can_accept:
+                try:
+                    item = raw_queue.get(timeout=0.05 if pending else None)
+                except queue.Empty:
+                    item = None
+                if item is _DONE:
+                    finished += 1
+                elif item is not None:
+                    filing, cik, content, error = item
+                    if error:
+                        yield {"filing": filing, "cik": cik, "text": error}
+                    else:
+                        pending[pool.submit(clean_filing_content, content)] = (filing, cik)
+                if not pending:
+                    continue
+
+            done, _ = wait(pending, timeout=0 if can_accept else None, return_when=FIRST_COMPLETED)
+            for future in done:
+                filing, cik = pending.pop(future)
+                try:
+                    text = future.result()
+                except Exception as e:
+                    text = f"Error parsing filing: {str(e)}"
+                yield {"filing": filing, "cik": cik, "text": text}
+
+
+def available_cores():
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--formtype", default="10-K")
+    parser.add_argument("--amount", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--raw-dir", default=None, help="save raw submissions (benchmark corpus)")
+    parser.add_argument("--out-dir", default="cleaned_filings")
+    args = parser.parse_args()
+
+    jobs = []
+    tickers = {}
+    for ticker in args.tickers:
+        cik = get_cik(ticker)
+        if not cik:
+            print(f"Could not find CIK for ticker {ticker}")
+            continue
+        tickers[cik] = ticker.upper()
+        jobs.extend((filing, cik) for filing in get_filing_urls(cik, args.formtype, args.amount))
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    start = time.perf_counter()
+    for result in ingest_filings(jobs, workers=args.workers, raw_dir=args.raw_dir):
+        path = os.path.join(args.out_dir, f"{result['cik']}_{result['filing']['accession']}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(result["text"])
+        filing_index.add(tickers[result["cik"]], args.formtype, result["filing"]["accession"],
+                         result["filing"]["filing_date"], result["text"])
+        print(f"{result['filing']['accession']}: {len(result['text']):,} chars")
+    print(f"Ingested {len(jobs)} filings in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
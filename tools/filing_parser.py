@@ -0,0 +1,69 @@
+import re
+
+# Kept free of network and langchain imports so process-pool workers start cheaply.
+
+def clean_filing_content(content):
+    """Extract readable text from every HTML document in a raw EDGAR .txt submission."""
+    from bs4 import BeautifulSoup
+    # Split by <DOCUMENT> tags
+    documents = re.split(r'<DOCUMENT>', content)
+    
+    all_text = []
+    
+    for doc in documents:
+        if not doc.strip() or '</DOCUMENT>' not in doc:
+            continue
+        
+        # Extract document content (everything before </DOCUMENT>)
+        doc_content = doc.split('</DOCUMENT>')[0]
+        
+        # Check the filename - skip exhibits and XML files
+        filename_match = re.search(r'<FILENAME>([^\n]+)', doc_content)
+        if filename_match:
+            filename = filename_match.group(1).strip().lower()
+            # Skip exhibits, XML files, and certain other files
+            if any(skip in filename for skip in ['ex-', '.xml', '.xsd', 'excel', 'graphic']):
+                continue
+        
+        # Look for HTML content
+        html_match = re.search(r'<html.*?>(.*)</html>', doc_content, re.DOTALL | re.IGNORECASE)
+        if html_match:
+            html_content = html_match.group(0)
+            
+            # Parse and clean
+            soup = BeautifulSoup(html_content, 'html.parser')
+            
+            # Remove unwanted tags
+            for tag in soup(['script', 'style', 'head', 'meta', 'link', 'title']):
+                tag.decompose()
+            
+            # Also remove ix:hidden sections (inline XBRL hidden content)
+            for tag in soup.find_all(attrs={'style': re.compile(r'display:\s*none', re.I)}):
+                tag.decompose()
+            
+            # Get text
+            text = soup.get_text(separator='\n')
+            
+            # Clean up
+            lines = []
+            for line in text.splitlines():
+                line = line.strip()
+                # Skip empty lines, URLs, and CIK numbers
+                if (line and 
+                    not line.startswith('http://') and 
+                    not re.match(r'^\d{10}$', line) and
+                    not line.startswith('xmlns') and
+                    len(line) > 2):
+                    lines.append(line)
+            
+            section_text = '\n'.join(lines)
+            
+            # Only add if it has substantial content
+            if len(section_text) > 1000:
+                all_text.append(section_text)
+    
+    if all_text:
+        combined = '\n\n--- DOCUMENT SECTION ---\n\n'.join(all_text)
+        return combined
+    else:
+        return "No readable HTML content found in filing. May be inline XBRL only."
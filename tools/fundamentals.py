@@ -0,0 +1,380 @@
+"""Numeric fundamentals from extracted filings, kept in a columnar store.
+
+The get_sec_filings schema returns every figure as text ("$394.3 billion",
+"(1,234)", "12.5%"). Each extraction is parsed into normalized numbers: the
+value fully scaled, plus the unit and the scale the text used. The figures are
+stored as one long row per (ticker, form type, period, field) in a parquet file.
+A time-series or cross-sectional question then reads only the rows it needs in a
+single scan, rather than re-extracting filings:
+
+    fundamentals.history("free_cash_flow", tickers, periods=5)    # ticker x last 5 periods
+    fundamentals.latest(["revenue", "net_income"], tickers)       # ticker x field
+
+    python -m tools.fundamentals free_cash_flow AAPL MSFT --periods 5
+
+The period is the filing date. Percentages are stored as fractions, amounts with
+no currency are taken as USD (SEC filings report in dollars), and a number with
+no scale word keeps scale 1.
+"""
+import argparse
+import glob
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from langchain_core.tools import tool
+from Observability.tracing import span
+
+DEFAULT_ROOT = "fundamentals"
+MAIN_FILE = "fundamentals.parquet"
+# tickers rewritten since the last compaction before their files are merged into the main one
+COMPACT_AFTER = 64
+ROW_GROUP_ROWS = 16384
+
+# get_sec_filings field -> kind of figure, which decides the default unit
+FIELDS = {
+    "revenue": "amount",
+    "gross_profit": "amount",
+    "operating_income": "amount",
+    "net_income": "amount",
+    "eps_basic": "per_share",
+    "eps_diluted": "per_share",
+    "total_assets": "amount",
+    "total_liabilities": "amount",
+    "total_equity": "amount",
+    "current_assets": "amount",
+    "current_liabilities": "amount",
+    "cash_and_equivalents": "amount",
+    "long_term_debt": "amount",
+    "operating_cash_flow": "amount",
+    "investing_cash_flow": "amount",
+    "financing_cash_flow": "amount",
+    "capital_expenditures": "amount",
+    "free_cash_flow": "amount",
+    "roe": "percent",
+    "roa": "percent",
+    "debt_to_equity": "multiple",
+    "current_ratio": "multiple",
+    "pe_ratio": "multiple",
+    "pb_ratio": "multiple",
+}
+
+COLUMNS = ["ticker", "form_type", "period", "field", "value", "unit", "scale", "raw", "accession"]
+
+SCALES = {"thousand": 1e3, "k": 1e3,
+          "million": 1e6, "mn": 1e6, "mm": 1e6, "m": 1e6,
+          "billion": 1e9, "bn": 1e9, "b": 1e9,
+          "trillion": 1e12, "tn": 1e12, "t": 1e12}
+CURRENCIES = {"$": "USD", "us$": "USD", "usd": "USD", "€": "EUR", "eur": "EUR", "£": "GBP", "gbp": "GBP"}
+
+NUMBER = re.compile(r"\d[\d,]*(?:\.\d+)?|\.\d+")
+YEAR = re.compile(r"(?:19|20)\d\d")
+SUFFIX = re.compile(r"\s*\)?\s*(%|percent\b|x\b|×|(?:thousand|million|billion|trillion|tn|bn|mn|mm|k|m|b|t)\b)", re.I)
+STATED_SCALE = re.compile(r"\bin (thousands|millions|billions)\b", re.I)
+CURRENCY = re.compile(r"us\$|\$|€|£|\b(?:usd|eur|gbp)\b", re.I)
+CURRENCY_BEFORE = re.compile(r"(?:us\$|\$|€|£|\b(?:usd|eur|gbp))\s*\(?\s*[-−–]?\s*$", re.I)
+# what precedes the number: an unclosed "(", a minus sign, or words that mean below zero
+NEGATIVE = re.compile(r"\([^)\d]*$|[-−–]\s*(?:us\$|\$|€|£)?\s*$|\b(?:negative|loss of|deficit of)\b[^\d]*$", re.I)
+MISSING = {"", "n/a", "na", "none", "null", "-", "—", "not disclosed", "not available", "not reported"}
+
+
+@dataclass(frozen=True)
+class Figure:
+    value: float    # sign * number * scale
+    unit: Optional[str]
+    scale: float    # multiplier the text implied (1e9 for "billion", 0.01 for "%")
+
+
+def _mark(text, match) -> Optional[str]:
+    """the kind of figure a number is marked as: "amount" by a currency sign or scale
+    word, "percent" by %, "multiple" by x; None when it is bare"""
+    suffix = SUFFIX.match(text[match.end():])
+    word = suffix.group(1).lower() if suffix else None
+    if word in ("%", "percent"):
+        return "percent"
+    if word in ("x", "×"):
+        return "multiple"
+    if word or CURRENCY_BEFORE.search(text[:match.start()]):
+        return "amount"
+    return None
+
+
+def _figure_number(text, kind):
+    """the number that is the figure: the first one marked as this kind of figure; failing
+    that the first bare one, skipping a leading year ("Fiscal 2023: 383,285"). Amounts never
+    fall back to a percentage or multiple ("grew 2% to $391 billion"), other kinds take any
+    marked number last."""
+    wanted = "amount" if kind in ("amount", "per_share") else kind
+    matches = list(NUMBER.finditer(text))
+    marks = [_mark(text, match) for match in matches]
+    for match, mark in zip(matches, marks):
+        if mark == wanted:
+            return match
+    for match, mark in zip(matches, marks):
+        if mark is None and not (YEAR.fullmatch(match.group()) and match is not matches[-1]):
+            return match
+    if wanted != "amount":
+        for match, mark in zip(matches, marks):
+            if mark is not None:
+                return match
+    return None
+
+
+def parse_figure(text, kind: str = "amount") -> Optional[Figure]:
+    """the number in an extracted figure, normalized; None when there is none"""
+    if text is None or isinstance(text, bool):
+        return None
+    if isinstance(text, (int, float)):
+        if kind == "percent":
+            # as for text: 15.2 means 15.2%, 0.152 is already a fraction
+            scale = 0.01 if text > 1 else 1.0
+            return Figure(float(text) * scale, "%", scale)
+        return Figure(float(text), None, 1.0)
+    text = str(text).strip()
+    if text.lower().strip(".") in MISSING:
+        return None
+    match = _figure_number(text, kind)
+    if not match:
+        return None
+    number = float(match.group().replace(",", ""))
+    prefix, rest = text[:match.start()], text[match.end():]
+    negative = bool(NEGATIVE.search(prefix))
+
+    scale, unit = 1.0, None
+    suffix = SUFFIX.match(rest)
+    word = suffix.group(1).lower() if suffix else None
+    if word in ("%", "percent"):
+        scale, unit = 0.01, "%"
+    elif word in ("x", "×"):
+        unit = "x"
+    elif word:
+        scale = SCALES[word]
+    else:
+        stated = STATED_SCALE.search(text)
+        if stated:
+            scale = SCALES[stated.group(1).lower()[:-1]]
+
+    if unit is None:
+        currency = CURRENCY.search(prefix) or CURRENCY.match(rest.lstrip())
+        if kind in ("amount", "per_share"):
+            unit = CURRENCIES[currency.group().lower()] if currency else "USD"
+            if kind == "per_share":
+                unit += "/share"
+        elif kind == "percent":
+            # a bare number for a percentage field: "15.2" means 15.2%, "0.152" is already a fraction
+            unit = "%"
+            if number > 1:
+                scale = 0.01
+        elif kind == "multiple":
+            unit = "x"
+    return Figure((-number if negative else number) * scale, unit, scale)
+
+
+def extraction_rows(ticker: str, form_type: str, period: str, result: dict, accession: str = None) -> List[dict]:
+    """one row per parseable figure of a get_sec_filings extraction"""
+    rows = []
+    for field, kind in FIELDS.items():
+        raw = result.get(field)
+        figure = parse_figure(raw, kind)
+        if figure is not None:
+            rows.append({"ticker": ticker.upper(), "form_type": form_type, "period": period, "field": field,
+                         "value": figure.value, "unit": figure.unit, "scale": figure.scale,
+                         "raw": str(raw), "accession": accession})
+    fields = {row["field"]: row for row in rows}
+    if "free_cash_flow" not in fields and "operating_cash_flow" in fields and "capital_expenditures" in fields:
+        # capex is reported as a payment, with or without a minus sign
+        value = fields["operating_cash_flow"]["value"] - abs(fields["capital_expenditures"]["value"])
+        rows.append(dict(fields["operating_cash_flow"], field="free_cash_flow", value=value,
+                         raw="operating_cash_flow - capital_expenditures"))
+    return rows
+
+
+def _schema():
+    import pyarrow as pa
+    return pa.schema([("ticker", pa.string()), ("form_type", pa.string()), ("period", pa.string()),
+                      ("field", pa.string()), ("value", pa.float64()), ("unit", pa.string()),
+                      ("scale", pa.float64()), ("raw", pa.string()), ("accession", pa.string())])
+
+
+class FundamentalsStore:
+    """Figures live in one main parquet file sorted by field, ticker and period, so a
+    query is one read that skips the row groups of other fields. Each add rewrites
+    that ticker's rows into a small file under delta/, which overrides the ticker's
+    rows in the main file; once there are `compact_after` deltas they are merged
+    into the main file. One writing process per root.
+    """
+    def __init__(self, root: Optional[str] = None, compact_after: int = COMPACT_AFTER):
+        self.root = root or os.environ.get("FUNDAMENTALS_DIR", DEFAULT_ROOT)
+        self.compact_after = compact_after
+        self._lock = threading.Lock()
+        self._warned = False
+
+    @property
+    def main_path(self):
+        return os.path.join(self.root, MAIN_FILE)
+
+    def _delta_path(self, ticker):
+        return os.path.join(self.root, "delta", f"{ticker.upper()}.parquet")
+
+    def _deltas(self) -> dict:
+        paths = glob.glob(os.path.join(self.root, "delta", "*.parquet"))
+        return {os.path.splitext(os.path.basename(path))[0]: path for path in paths}
+
+    def _write(self, table, path, **options):
+        import pyarrow.parquet as pq
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        pq.write_table(table, tmp, compression="zstd", **options)
+        os.replace(tmp, path)
+
+    def add(self, ticker: str, form_type: str, period: str, result: dict, accession: str = None) -> int:
+        """store one filing's figures, replacing any stored for the same period; returns rows written"""
+        rows = extraction_rows(ticker, form_type, period, result, accession)
+        if not rows:
+            return 0
+        try:
+            import pandas as pd
+            import pyarrow as pa
+        except ImportError:
+            if not self._warned:
+                print("No parquet engine installed (pip install pyarrow), fundamentals are not stored")
+                self._warned = True
+            return 0
+        with self._lock, span("fundamentals.add", ticker=ticker, period=period, rows=len(rows)):
+            stored = self._read([ticker]).to_pandas()
+            stored = stored[~((stored["form_type"] == form_type) & (stored["period"] == period))]
+            frame = pd.concat([stored, pd.DataFrame(rows, columns=COLUMNS)], ignore_index=True)
+            frame = frame.sort_values(["field", "form_type", "period"], ignore_index=True)
+            self._write(pa.Table.from_pandas(frame, schema=_schema(), preserve_index=False),
+                        self._delta_path(ticker))
+            if len(self._deltas()) >= self.compact_after:
+                self._compact()
+        return len(rows)
+
+    def compact(self):
+        """merge every delta into the main file"""
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        deltas = self._deltas()
+        if not deltas:
+            return
+        with span("fundamentals.compact", deltas=len(deltas)):
+            table = self._read().sort_by([("field", "ascending"), ("ticker", "ascending"),
+                                          ("form_type", "ascending"), ("period", "ascending")])
+            self._write(table, self.main_path, row_group_size=ROW_GROUP_ROWS)
+            # a crash before this point leaves deltas identical to what they override
+            for path in deltas.values():
+                os.remove(path)
+
+    def _read(self, tickers: Optional[List[str]] = None, fields: Optional[List[str]] = None,
+              form_type: Optional[str] = None):
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        condition = ds.scalar(True)
+        if tickers is not None:
+            names = {t.upper() for t in tickers}
+            condition = condition & ds.field("ticker").isin(sorted(names))
+        if fields is not None:
+            condition = condition & ds.field("field").isin(list(fields))
+        if form_type:
+            condition = condition & (ds.field("form_type") == form_type)
+        deltas = self._deltas()
+        if tickers is not None:
+            deltas = {t: path for t, path in deltas.items() if t in names}
+
+        tables = []
+        if os.path.exists(self.main_path):
+            main = condition & ~ds.field("ticker").isin(list(deltas)) if deltas else condition
+            tables.append(ds.dataset(self.main_path, schema=_schema(), format="parquet").to_table(filter=main))
+        if deltas:
+            tables.append(ds.dataset(list(deltas.values()), schema=_schema(), format="parquet").to_table(filter=condition))
+        return pa.concat_tables(tables) if tables else _schema().empty_table()
+
+    def frame(self, tickers: Optional[List[str]] = None, fields: Optional[List[str]] = None,
+              form_type: Optional[str] = None):
+        """stored rows as a long DataFrame"""
+        with span("fundamentals.read", tickers=len(tickers) if tickers is not None else None):
+            return self._read(tickers, fields, form_type).to_pandas()
+
+    def history(self, field: str, tickers: Optional[List[str]] = None, periods: int = 5, form_type: str = "10-K"):
+        """ticker x period offset (-periods+1 .. 0, 0 = latest filing) of one field;
+        requested tickers with nothing stored are all-NaN rows"""
+        data = self.frame(tickers, [field], form_type).dropna(subset=["value"])
+        data = data.sort_values(["ticker", "period"])
+        data["offset"] = -data.groupby("ticker").cumcount(ascending=False)
+        data = data[data["offset"] > -periods]
+        wide = data.pivot(index="ticker", columns="offset", values="value").reindex(columns=range(1 - periods, 1))
+        return wide.reindex([t.upper() for t in tickers]) if tickers is not None else wide
+
+    def latest(self, fields: List[str], tickers: Optional[List[str]] = None, form_type: str = "10-K",
+               as_of: Optional[str] = None):
+        """ticker x field, each the latest stored value (filed on or before `as_of`)"""
+        data = self.frame(tickers, fields, form_type).dropna(subset=["value"])
+        if as_of:
+            data = data[data["period"] <= as_of]
+        data = data.sort_values("period").drop_duplicates(["ticker", "field"], keep="last")
+        wide = data.pivot(index="ticker", columns="field", values="value").reindex(columns=list(fields))
+        return wide.reindex([t.upper() for t in tickers]) if tickers is not None else wide
+
+
+fundamentals = FundamentalsStore()
+
+
+def stored_value(ticker: str, field: str, form_type: str = "10-K") -> Optional[float]:
+    """latest stored value of one field for one ticker, or None"""
+    try:
+        latest = fundamentals.latest([field], [ticker], form_type)
+    except ImportError:
+        return None
+    if ticker.upper() not in latest.index:
+        return None
+    value = latest.at[ticker.upper(), field]
+    return None if value != value else float(value)   # NaN: not stored
+
+
+@tool
+def get_fundamentals(tickers: List[str], fields: List[str], periods: int = 5, form_type: str = "10-K") -> dict:
+    """Numeric figures from SEC filings already extracted with get_sec_filings, for one or many
+    tickers at once (e.g. 5 years of free_cash_flow for a peer group). Amounts are in USD,
+    percentages as decimals. Fields: revenue, gross_profit, operating_income, net_income,
+    eps_basic, eps_diluted, total_assets, total_liabilities, total_equity, current_assets,
+    current_liabilities, cash_and_equivalents, long_term_debt, operating_cash_flow,
+    investing_cash_flow, financing_cash_flow, capital_expenditures, free_cash_flow, roe, roa,
+    debt_to_equity, current_ratio, pe_ratio, pb_ratio.
+    Returns {field: {ticker: {period: value}}}, oldest period first; tickers never extracted are listed under "missing".
+    """
+    unknown = [field for field in fields if field not in FIELDS]
+    if unknown:
+        return {"error": f"Unknown fields {unknown}, expected some of {list(FIELDS)}"}
+    data = fundamentals.frame(tickers, fields, form_type).dropna(subset=["value"])
+    data = data.sort_values(["ticker", "field", "period"]).groupby(["ticker", "field"]).tail(periods)
+    result = {field: {} for field in fields}
+    for ticker, field, period, value in zip(data["ticker"], data["field"], data["period"], data["value"]):
+        result[field].setdefault(ticker, {})[period] = value
+    found = set(data["ticker"])
+    return {"form_type": form_type, "fields": result,
+            "missing": [t.upper() for t in tickers if t.upper() not in found]}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("field", choices=sorted(FIELDS))
+    parser.add_argument("tickers", nargs="*", help="default: every stored ticker")
+    parser.add_argument("--periods", type=int, default=5)
+    parser.add_argument("--formtype", default="10-K")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    history = fundamentals.history(args.field, args.tickers or None, args.periods, args.formtype)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(history.to_string())
+    print(f"{len(history)} tickers in {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
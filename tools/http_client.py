@@ -0,0 +1,43 @@
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from Observability.tracing import span
+
+# one pooled session for every scraper and SEC call, instead of a fresh connection per request
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+session.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=32))
+
+_route_base = None
+_recorder = None
+
+
+def route_to(base_url):
+    """send every request to base_url/<host>/<path> instead of the real host (offline fixtures).
+    Pass None to go back to the network."""
+    global _route_base
+    _route_base = base_url.rstrip("/") if base_url else None
+
+
+def record_with(callback):
+    """call callback(url, response) after every live request (fixture recording). None to stop."""
+    global _recorder
+    _recorder = callback
+
+
+def _routed(url):
+    if _route_base is None:
+        return url
+    parts = urlsplit(url)
+    query = f"?{parts.query}" if parts.query else ""
+    return f"{_route_base}/{parts.netloc}{parts.path}{query}"
+
+
+def get(url, **kwargs):
+    """requests.get through the shared session, traced as an http.get span"""
+    with span("http.get", url=url) as current:
+        response = session.get(_routed(url), **kwargs)
+        current.set_attributes(status=response.status_code, bytes=len(response.content))
+        if _recorder is not None:
+            _recorder(url, response)
+        return response
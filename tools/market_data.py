@@ -0,0 +1,202 @@
+"""One access layer for Yahoo market data.
+
+get_complete_stock_info (yfinance) and the ratio tools (yahooquery) used to reach
+Yahoo through two clients and fetch the same quoteSummary fields twice. Every
+market-data read now goes through MarketData, which:
+
+- reuses connections and Yahoo's cookie/crumb handshake: yfinance shares one
+  session across its Ticker objects, and yahooquery sessions are kept. A fresh
+  yfinance Ticker is made per fetch, since a Ticker caches what it has read;
+- caches each (endpoint, ticker) read for `ttl` seconds and coalesces concurrent
+  identical reads, so one analysis hits Yahoo once per ticker and endpoint;
+- normalizes Yahoo's field names once (FIELD_MAP). Ratios are served from an
+  already-fetched quote when there is one, instead of a second request.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from Observability.tracing import span
+from tools.coalesce import Coalescer
+
+# our field name -> Yahoo quoteSummary key (identical in yfinance .info and yahooquery modules)
+FIELD_MAP = {
+    "pe_ratio": "trailingPE",
+    "forward_pe": "forwardPE",
+    "pb_ratio": "priceToBook",
+    "price_to_sales": "priceToSalesTrailing12Months",
+    "roe": "returnOnEquity",
+    "roa": "returnOnAssets",
+    "current_ratio": "currentRatio",
+    "quick_ratio": "quickRatio",
+    "debt_to_equity": "debtToEquity",
+    "beta": "beta",
+    "dividend_rate": "dividendRate",
+    "dividend_yield": "dividendYield",
+    "market_cap": "marketCap",
+    "enterprise_value": "enterpriseValue",
+    "free_cash_flow": "freeCashflow",
+    "shares_outstanding": "sharesOutstanding",
+}
+
+RATIO_FIELDS = ["pe_ratio", "pb_ratio", "roe", "current_ratio", "debt_to_equity"]
+RATIO_MODULES = ["defaultKeyStatistics", "financialData", "summaryDetail"]
+
+
+def yf_ticker(ticker: str):
+    import yfinance as yf
+    return yf.Ticker(ticker)
+
+
+def normalize(quote: dict) -> dict:
+    """Yahoo quote fields -> our field names"""
+    return {field: quote.get(key) for field, key in FIELD_MAP.items()}
+
+
+def _flatten_modules(payload) -> dict:
+    """merge one symbol's yahooquery modules into a single quote dict; {} on failure"""
+    if not isinstance(payload, dict):
+        # yahooquery reports per-symbol failures as a plain string
+        return {}
+    quote = {}
+    for module in RATIO_MODULES:   # later modules win, summaryDetail has trailingPE
+        if isinstance(payload.get(module), dict):
+            quote.update(payload[module])
+    return quote
+
+
+def _ratios_from_quote(quote: dict) -> dict:
+    values = normalize(quote)
+    return {field: values[field] for field in RATIO_FIELDS}
+
+
+class TickerView:
+    """yfinance.Ticker-shaped view whose reads go through MarketData's caches"""
+    def __init__(self, market, ticker):
+        self._market = market
+        self._ticker = ticker
+
+    @property
+    def info(self):
+        return self._market.read("info", self._ticker)
+
+    @property
+    def dividends(self):
+        return self._market.read("dividends", self._ticker)
+
+    @property
+    def financials(self):
+        return self._market.read("financials", self._ticker)
+
+    @property
+    def balance_sheet(self):
+        return self._market.read("balance_sheet", self._ticker)
+
+    @property
+    def cashflow(self):
+        return self._market.read("cashflow", self._ticker)
+
+
+class MarketData:
+    ENDPOINTS = ["info", "dividends", "financials", "balance_sheet", "cashflow", "ratios"]
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self.endpoints = {name: Coalescer(ttl) for name in self.ENDPOINTS}
+        self._yq_sessions = {}   # asynchronous -> yahooquery session
+        self._lock = threading.Lock()
+
+    def ticker(self, symbol: str) -> TickerView:
+        return TickerView(self, symbol.strip().upper())
+
+    def read(self, endpoint, symbol):
+        """one yfinance endpoint for one ticker, cached and coalesced"""
+        symbol = symbol.strip().upper()
+
+        def fetch():
+            with span("market_data.fetch", endpoint=endpoint, ticker=symbol):
+                # a new Ticker each time: a kept one would hand back its own cached
+                # .info and price history after this entry expires
+                return getattr(yf_ticker(symbol), endpoint)
+        return self.endpoints[endpoint].get(symbol, fetch)
+
+    def quote(self, symbol):
+        """normalized quote fields for a ticker"""
+        return normalize(self.read("info", symbol) or {})
+
+    def ratios(self, tickers: List[str], chunk_size: int = 50, max_workers: int = 4) -> Dict[str, dict]:
+        """key ratios for many tickers.
+
+        Tickers whose quote is already cached are answered from it; the rest are
+        fetched with chunked, concurrent multi-symbol yahooquery requests. Failed
+        tickers carry an {"error": ...} entry, so one bad symbol never sinks the batch.
+        """
+        symbols = list(dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()))
+        results, missing = {}, []
+        for symbol in symbols:
+            found, quote = self.endpoints["info"].cache.get(symbol)
+            if found and quote:
+                results[symbol] = _ratios_from_quote(quote)
+                continue
+            found, ratios = self.endpoints["ratios"].cache.get(symbol)
+            if found:
+                results[symbol] = ratios
+            else:
+                missing.append(symbol)
+
+        if len(missing) == 1:
+            # single tickers are coalesced with concurrent identical requests
+            symbol = missing[0]
+            results[symbol] = self.endpoints["ratios"].get(
+                symbol, lambda: self._fetch_ratio_chunk([symbol])[symbol],
+                cache_if=lambda value: "error" not in value)
+        elif missing:
+            chunks = [missing[i:i + chunk_size] for i in range(0, len(missing), chunk_size)]
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as pool:
+                for chunk_result in pool.map(self._fetch_ratio_chunk, chunks):
+                    for symbol, ratios in chunk_result.items():
+                        if "error" not in ratios:
+                            self.endpoints["ratios"].cache.put(symbol, ratios)
+                    results.update(chunk_result)
+        return {symbol: results[symbol] for symbol in symbols}
+
+    def stats(self):
+        return {name: coalescer.stats() for name, coalescer in self.endpoints.items()}
+
+    def clear(self):
+        with self._lock:
+            self.endpoints = {name: Coalescer(self.ttl) for name in self.ENDPOINTS}
+
+    def _fetch_ratio_chunk(self, symbols: List[str]) -> Dict[str, dict]:
+        """one multi-symbol yahooquery request for a chunk of tickers"""
+        from yahooquery import Ticker
+        try:
+            with span("yahooquery.fetch", symbols=len(symbols)):
+                # reuse connections across requests. yahooquery only fetches a chunk's
+                # symbols concurrently on a FuturesSession and keeps whatever session it
+                # is given, so single and multi-symbol requests each get their own
+                asynchronous = len(symbols) > 1
+                with self._lock:
+                    session = self._yq_sessions.get(asynchronous)
+                ticker = Ticker(symbols, asynchronous=asynchronous, session=session)
+                with self._lock:
+                    self._yq_sessions.setdefault(asynchronous, ticker.session)
+                data = ticker.get_modules(RATIO_MODULES)
+        except Exception as e:
+            return {symbol: {"error": f"Request failed: {str(e)}"} for symbol in symbols}
+        if not isinstance(data, dict):
+            return {symbol: {"error": str(data)} for symbol in symbols}
+
+        results = {}
+        for symbol in symbols:
+            quote = _flatten_modules(data.get(symbol))
+            if quote:
+                results[symbol] = _ratios_from_quote(quote)
+            else:
+                payload = data.get(symbol)
+                results[symbol] = {"error": str(payload) if isinstance(payload, str) and payload
+                                   else "No data found for ticker"}
+        return results
+
+
+market_data = MarketData()
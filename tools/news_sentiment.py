@@ -1,13 +1,19 @@
-import requests
-from bs4 import BeautifulSoup
+from tools import http_client
 import json
 from datetime import datetime
 from typing import List, Dict
 import re
 from urllib.parse import quote
-from langchain.tools import tool
+from langchain_core.tools import tool
 from DataExtraction.DataExtractor import EXTRACT
-from Schemas.extraction_schemas import get_news_sentiment
+from tools.artifacts import artifacts, artifact_reply
+
+# scraped news and its sentiment are reused for this long before scraping again
+NEWS_MAX_AGE = 15 * 60
+
+def _soup(content):
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(content, 'html.parser')
 
 def get_google_finance_news(symbol: str) -> List[Dict]:
     """Scrape news from Google Finance"""
@@ -17,8 +23,8 @@ def get_google_finance_news(symbol: str) -> List[Dict]:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        response = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        response = http_client.get(url, headers=headers, timeout=10)
+        soup = _soup(response.content)
         
         # Find news articles
         news_items = soup.find_all('div', class_='yY3Lee')
@@ -52,8 +58,8 @@ def get_yahoo_finance_news(symbol: str) -> List[Dict]:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        response = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        response = http_client.get(url, headers=headers, timeout=10)
+        soup = _soup(response.content)
         
         # Find news articles
         news_items = soup.find_all('li', class_='stream-item')
@@ -87,8 +93,8 @@ def get_seeking_alpha_news(symbol: str) -> List[Dict]:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        response = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        response = http_client.get(url, headers=headers, timeout=10)
+        soup = _soup(response.content)
         
         # Find news articles
         news_items = soup.find_all('article')
@@ -125,8 +131,8 @@ def get_marketwatch_news(symbol: str) -> List[Dict]:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        response = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        response = http_client.get(url, headers=headers, timeout=10)
+        soup = _soup(response.content)
         
         # Find news articles
         news_items = soup.find_all('div', class_='article__content')
@@ -156,8 +162,31 @@ def get_marketwatch_news(symbol: str) -> List[Dict]:
     return articles
 
 @tool
-def get_all_news(symbol: str) -> List[Dict]:
-    """Fetch news from multiple sources"""
+def get_all_news(symbol: str) -> Dict:
+    """Fetch news from multiple sources.
+    Returns an artifact handle to the articles and extracted sentiment, plus a short summary."""
+    key = symbol.strip().upper()
+    handle = artifacts.find("news", key, max_age=NEWS_MAX_AGE)
+    if handle:
+        return artifact_reply(handle, summarize_news(artifacts.get(handle)))
+
+    unique_articles = collect_news(symbol)
+    extracted = EXTRACT("get_news_sentiment",json.dumps(unique_articles))
+    result = extracted.model_dump() if hasattr(extracted, "model_dump") else extracted
+    news = {"articles": unique_articles, "sentiment": result}
+    handle = artifacts.put("news", news, key=key)
+    return artifact_reply(handle, summarize_news(news))
+
+
+def summarize_news(news: Dict) -> Dict:
+    """article count, the first headlines and the sentiment of a stored news artifact"""
+    return {"articles": len(news["articles"]),
+            "headlines": [a['headline'] for a in news["articles"][:5]],
+            "sentiment": news["sentiment"]}
+
+
+def collect_news(symbol: str) -> List[Dict]:
+    """Scrape every news source and drop duplicate headlines, without extraction"""
     print(f"Fetching news for {symbol} from multiple sources...\n")
     
     all_articles = []
@@ -187,8 +216,7 @@ def get_all_news(symbol: str) -> List[Dict]:
         if article['headline'] and article['headline'] not in seen:
             seen.add(article['headline'])
             unique_articles.append(article)
-
-    return EXTRACT("get_news_sentiment",json.dumps(unique_articles))
+    return unique_articles
 
 
 
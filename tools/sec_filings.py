@@ -1,28 +1,60 @@
-from langchain.tools import tool
+from langchain_core.tools import tool
 import json 
-import requests
-import re
-from Schemas.extraction_schemas import EXTRACT
+from tools import http_client
+from DataExtraction.IncrementalExtractor import extract_filings
+from tools.artifacts import artifacts, artifact_reply
 import time
-from bs4 import BeautifulSoup
+from tools.filing_parser import clean_filing_content
+from tools.filing_index import filing_index
+from Observability.tracing import span
+
+# headline figures echoed back to the agent; the full extraction stays in the artifact
+SUMMARY_FIELDS = ["company_name", "form_type", "filing_date", "revenue", "net_income",
+                  "operating_cash_flow", "free_cash_flow", "total_debt", "long_term_debt",
+                  "cash_and_equivalents", "eps_diluted"]
+
+# pause between filing downloads to stay under SEC's request rate
+SEC_REQUEST_DELAY = 0.2
+
+# an extraction is reused for a day, then filings are checked again for a newer one
+SEC_FILINGS_MAX_AGE = 24 * 3600
 
 @tool
 def get_sec_filings(formtype: str, ticker: str, amount: int):
     """
     Get the latest filings (10-K, 10-Q, 8-K) for a ticker.
-    Returns a json.
+    Returns an artifact handle to the full extraction and a summary of headline figures.
     """
-    
+    key = f"{ticker.upper()}:{formtype}:{amount}"
+    handle = artifacts.find("sec_filings", key, max_age=SEC_FILINGS_MAX_AGE)
+    if handle:
+        return artifact_reply(handle, summarize_filing(artifacts.get(handle)))
+
     cik = get_cik(ticker)
     if not cik:
         return json.dumps({"error": f"Could not find CIK for ticker {ticker}"})
     
     print(f"Found CIK {cik} for {ticker}")
     
+    all_filings_json = fetch_filings(cik, ticker, formtype, amount)
+    
+    if not all_filings_json:
+        return json.dumps({"error": f"No {formtype} filings found for {ticker}"})
+
+    # only text that changed since the company's previous filings reaches the model
+    result = extract_filings(all_filings_json)
+    if "error" in result:
+        return json.dumps(result)
+    handle = artifacts.put("sec_filings", result, key=key)
+    return artifact_reply(handle, summarize_filing(result))
+
+
+def fetch_filings(cik, ticker, formtype, amount):
+    """Download and clean the latest filings of one form type, without extraction."""
     filings = get_filing_urls(cik, formtype, amount)
     
     if not filings:
-        return json.dumps({"error": f"No {formtype} filings found for {ticker}"})
+        return []
     
     print(f"Found {len(filings)} {formtype} filings")
     
@@ -32,6 +64,7 @@ def get_sec_filings(formtype: str, ticker: str, amount: int):
         print(f"Processing {filing['accession']}...")
         
         text = download_filing_text(filing, cik)
+        filing_index.add(ticker, formtype, filing['accession'], filing['filing_date'], text)
         
         filing_data = {
             "ticker": ticker,
@@ -42,28 +75,48 @@ def get_sec_filings(formtype: str, ticker: str, amount: int):
         }
         all_filings_json.append(filing_data)
         
-        time.sleep(0.2)
+        time.sleep(SEC_REQUEST_DELAY)
     
     print(f"Successfully processed {len(all_filings_json)} filings")
+    return all_filings_json
 
-    return EXTRACT("get_sec_filings",json.dumps(all_filings_json, separators=(",", ":")))
+
+def summarize_filing(result) -> dict:
+    if not isinstance(result, dict):
+        return {"result": str(result)[:500]}
+    summary = {field: result.get(field) for field in SUMMARY_FIELDS}
+    summary["fields_filled"] = sum(1 for key, value in result.items()
+                                   if value and key not in ("changes", "extraction"))
+    changes = result.get("changes")
+    if changes:
+        summary["changes"] = {"against": changes["against"],
+                              "paragraphs_added": changes["paragraphs_added"],
+                              "paragraphs_removed": changes["paragraphs_removed"],
+                              "fields_changed": sorted(changes["fields"])}
+    return summary
      
 
 
-def get_cik(ticker):
-    """Get CIK number for a ticker symbol."""
-    try:
+_company_tickers = None
+
+def load_company_tickers():
+    """SEC ticker -> CIK table, downloaded once per process."""
+    global _company_tickers
+    if _company_tickers is None:
         url = "https://www.sec.gov/files/company_tickers.json"
         headers = {'User-Agent': 'Mozilla/5.0 (bastion.reyniel@fontfee.com)'}
         
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url, headers=headers)
         data = response.json()
-        
-        for item in data.values():
-            if item['ticker'].upper() == ticker.upper():
-                return str(item['cik_str']).zfill(10)
-        
-        return None
+        _company_tickers = {item['ticker'].upper(): str(item['cik_str']).zfill(10)
+                            for item in data.values()}
+    return _company_tickers
+
+
+def get_cik(ticker):
+    """Get CIK number for a ticker symbol."""
+    try:
+        return load_company_tickers().get(ticker.upper())
     except Exception as e:
         print(f"Error getting CIK: {e}")
         return None
@@ -75,7 +128,7 @@ def get_filing_urls(cik, form_type, limit):
         url = f"https://data.sec.gov/submissions/CIK{cik}.json"
         headers = {'User-Agent': 'Mozilla/5.0 (bastion.reyniel@fontfee.com)'}
         
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url, headers=headers)
         data = response.json()
         
         filings = []
@@ -101,82 +154,28 @@ def get_filing_urls(cik, form_type, limit):
         return []
 
 
+def filing_url(filing, cik):
+    accession_no_dash = filing['accession'].replace('-', '')
+    return f"https://www.sec.gov/Archives/edgar/data/{cik}/{accession_no_dash}/{filing['accession']}.txt"
+
+
+def download_filing_raw(filing, cik):
+    """Download the raw EDGAR submission text for a filing (network only, no parsing)."""
+    headers = {'User-Agent': 'Mozilla/5.0 (bastion.reyniel@fontfee.com)'}
+    txt_url = filing_url(filing, cik)
+    
+    print(f"  Downloading from: {txt_url}")
+    response = http_client.get(txt_url, headers=headers)
+    response.raise_for_status()
+    return response.text
+
+
 def download_filing_text(filing, cik):
     """Download filing and extract text from any HTML document found."""
     try:
-        headers = {'User-Agent': 'Mozilla/5.0 (bastion.reyniel@fontfee.com)'}
-        
-        accession_no_dash = filing['accession'].replace('-', '')
-        txt_url = f"https://www.sec.gov/Archives/edgar/data/{cik}/{accession_no_dash}/{filing['accession']}.txt"
-        
-        print(f"  Downloading from: {txt_url}")
-        response = requests.get(txt_url, headers=headers)
-        response.raise_for_status()
-        
-        content = response.text
-        
-        # Split by <DOCUMENT> tags
-        documents = re.split(r'<DOCUMENT>', content)
-        
-        all_text = []
-        
-        for doc in documents:
-            if not doc.strip() or '</DOCUMENT>' not in doc:
-                continue
-            
-            # Extract document content (everything before </DOCUMENT>)
-            doc_content = doc.split('</DOCUMENT>')[0]
-            
-            # Check the filename - skip exhibits and XML files
-            filename_match = re.search(r'<FILENAME>([^\n]+)', doc_content)
-            if filename_match:
-                filename = filename_match.group(1).strip().lower()
-                # Skip exhibits, XML files, and certain other files
-                if any(skip in filename for skip in ['ex-', '.xml', '.xsd', 'excel', 'graphic']):
-                    continue
-            
-            # Look for HTML content
-            html_match = re.search(r'<html.*?>(.*)</html>', doc_content, re.DOTALL | re.IGNORECASE)
-            if html_match:
-                html_content = html_match.group(0)
-                
-                # Parse and clean
-                soup = BeautifulSoup(html_content, 'html.parser')
-                
-                # Remove unwanted tags
-                for tag in soup(['script', 'style', 'head', 'meta', 'link', 'title']):
-                    tag.decompose()
-                
-                # Also remove ix:hidden sections (inline XBRL hidden content)
-                for tag in soup.find_all(attrs={'style': re.compile(r'display:\s*none', re.I)}):
-                    tag.decompose()
-                
-                # Get text
-                text = soup.get_text(separator='\n')
-                
-                # Clean up
-                lines = []
-                for line in text.splitlines():
-                    line = line.strip()
-                    # Skip empty lines, URLs, and CIK numbers
-                    if (line and 
-                        not line.startswith('http://') and 
-                        not re.match(r'^\d{10}$', line) and
-                        not line.startswith('xmlns') and
-                        len(line) > 2):
-                        lines.append(line)
-                
-                section_text = '\n'.join(lines)
-                
-                # Only add if it has substantial content
-                if len(section_text) > 1000:
-                    all_text.append(section_text)
-        
-        if all_text:
-            combined = '\n\n--- DOCUMENT SECTION ---\n\n'.join(all_text)
-            return combined
-        else:
-            return "No readable HTML content found in filing. May be inline XBRL only."
+        content = download_filing_raw(filing, cik)
+        with span("filing.parse", accession=filing['accession'], bytes=len(content)):
+            return clean_filing_content(content)
     
     except Exception as e:
-        return f"Error downloading filing: {str(e)}"
\ No newline at end of file
+        return f"Error downloading filing: {str(e)}"
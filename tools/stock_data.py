@@ -1,5 +1,15 @@
-from langchain.tools import tool
-import yfinance as yf
+from langchain_core.tools import tool
+from tools.artifacts import artifacts, artifact_reply
+from Observability.tracing import traced
+from tools.market_data import market_data
+
+# scalar fields echoed back to the agent; everything else stays in the artifact
+SUMMARY_FIELDS = ["current_price", "market_cap", "shares_outstanding", "pe_ratio", "forward_pe",
+                  "price_to_book", "beta", "dividend_rate", "dividend_yield", "dividend_growth_rate",
+                  "earnings_per_share", "free_cash_flow", "total_debt", "total_cash",
+                  "revenue_growth", "sector", "industry"]
+
+STOCK_INFO_MAX_AGE = 15 * 60
 
 @tool
 def get_complete_stock_info(ticker: str) -> dict:
@@ -17,10 +27,27 @@ def get_complete_stock_info(ticker: str) -> dict:
         ticker: Stock ticker symbol (e.g., 'AAPL', 'MSFT')
     
     Returns:
-        Dictionary with all available financial data
+        Dictionary with an artifact handle to the full data and a summary of key
+        metrics. Pass the handle to the valuation tools instead of copying numbers.
     """
+    symbol = ticker.strip().upper()
+    handle = artifacts.find("stock_info", symbol, max_age=STOCK_INFO_MAX_AGE)
+    if handle:
+        return artifact_reply(handle, summarize_stock_info(artifacts.get(handle)))
+
+    result = fetch_stock_info(ticker)
+    if "error" in result:
+        return result
+    handle = artifacts.put("stock_info", result, key=symbol)
+    return artifact_reply(handle, summarize_stock_info(result))
+
+
+@traced("yfinance.fetch")
+def fetch_stock_info(ticker: str) -> dict:
+    """Fetch the full stock info dict behind get_complete_stock_info."""
     try:
-        stock = yf.Ticker(ticker)
+        # reads are cached and shared with the ratio tools
+        stock = market_data.ticker(ticker)
         
         # Get all available data
         info = stock.info
@@ -123,3 +150,7 @@ def get_complete_stock_info(ticker: str) -> dict:
         
     except Exception as e:
         return {"error": f"Failed to fetch data for {ticker}: {str(e)}"}
+
+
+def summarize_stock_info(result: dict) -> dict:
+    return {field: result.get(field) for field in SUMMARY_FIELDS}
@@ -1,26 +1,57 @@
-from langchain.tools import tool
-import yfinance as yf
+from langchain_core.tools import tool
 from typing import Optional
-import pandas as pd
+from tools.artifacts import artifacts
+from tools.fundamentals import stored_value
+
+
+def _stock_info(handle: Optional[str]):
+    """resolves a get_complete_stock_info artifact handle to its data dict"""
+    if not handle:
+        return None, None
+    info = artifacts.get(handle)
+    if not isinstance(info, dict):
+        return None, {"error": f"Unknown artifact {handle}"}
+    return info, None
 
 
 @tool
 def calculate_dcf(
-    cash_flows: list[float],
     discount_rate: float,
-    terminal_growth_rate: float = 0.02
+    cash_flows: Optional[list[float]] = None,
+    terminal_growth_rate: float = 0.02,
+    stock_info: Optional[str] = None,
+    growth_rate: float = 0.05,
+    years: int = 5,
+    ticker: Optional[str] = None
 ) -> dict:
     """
     Calculate the intrinsic value of a company using the Discounted Cash Flow (DCF) model.
 
     Args:
-        cash_flows: list of projected free cash flows (e.g., 5 years)
         discount_rate: required rate of return (as decimal, e.g., 0.1 for 10%)
+        cash_flows: list of projected free cash flows (e.g., 5 years). Optional when stock_info is given
         terminal_growth_rate: perpetual growth rate after projection period (default 2%)
+        stock_info: artifact handle from get_complete_stock_info; without cash_flows, its latest
+            free cash flow is projected forward at growth_rate for `years` years
+        growth_rate: growth used to project cash flows from stock_info (default 5%)
+        years: projection period used with stock_info (default 5)
+        ticker: without cash_flows, project the free cash flow of the ticker's latest extracted
+            10-K instead (preferred over stock_info's figure when one is stored)
 
     Returns:
-        dict with present_value_per_share and intermediate steps
+        dict with present_value (and value_per_share when shares outstanding are known) and intermediate steps
     """
+    info, error = _stock_info(stock_info)
+    if error:
+        return error
+    base = None
+    if not cash_flows and ticker:
+        base = stored_value(ticker, "free_cash_flow")
+    if not cash_flows and base is None and info and info.get("free_cash_flow"):
+        base = float(info["free_cash_flow"])
+    if base is not None:
+        cash_flows = [base * (1 + growth_rate) ** i for i in range(1, years + 1)]
+
     if not cash_flows or discount_rate <= terminal_growth_rate:
         return {"error": "Invalid inputs — check cash flows or rates."}
 
@@ -32,30 +63,46 @@ def calculate_dcf(
     terminal_pv = terminal_value / ((1 + discount_rate) ** len(cash_flows))
 
     total_value = pv_sum + terminal_pv
-    return {
+    result = {
         "present_value": round(total_value, 2),
         "terminal_value": round(terminal_value, 2),
         "explanation": f"Discounted {len(cash_flows)} years of cash flow at {discount_rate*100:.1f}% with terminal growth {terminal_growth_rate*100:.1f}%."
     }
+    if info and info.get("shares_outstanding"):
+        result["value_per_share"] = round(total_value / info["shares_outstanding"], 2)
+    return result
 
 
 @tool
 def calculate_ddm(
-    dividend_next_year: float,
-    growth_rate: float,
-    discount_rate: float
+    discount_rate: float,
+    dividend_next_year: Optional[float] = None,
+    growth_rate: Optional[float] = None,
+    stock_info: Optional[str] = None
 ) -> dict:
     """
     Calculate stock value using the Dividend Discount Model (DDM).
 
     Args:
-        dividend_next_year: expected dividend for next year
-        growth_rate: expected annual dividend growth rate (decimal)
         discount_rate: required rate of return (decimal)
+        dividend_next_year: expected dividend for next year. Optional when stock_info is given
+        growth_rate: expected annual dividend growth rate (decimal). Optional when stock_info is given
+        stock_info: artifact handle from get_complete_stock_info; supplies the dividend rate
+            and historical dividend growth for any input left out
 
     Returns:
         dict with estimated intrinsic value
     """
+    info, error = _stock_info(stock_info)
+    if error:
+        return error
+    if growth_rate is None and info:
+        growth_rate = info.get("dividend_growth_rate")
+    if dividend_next_year is None and info and info.get("dividend_rate") and growth_rate is not None:
+        dividend_next_year = info["dividend_rate"] * (1 + growth_rate)
+
+    if dividend_next_year is None or growth_rate is None:
+        return {"error": "Missing dividend or growth rate — pass them or a stock_info handle with dividend data."}
     if discount_rate <= growth_rate:
         return {"error": "Discount rate must be greater than growth rate."}
 
@@ -67,23 +114,34 @@ def calculate_ddm(
 
 @tool
 def calculate_comparable_valuation(
-    company_metric: float,
-    peer_avg_multiple: float) -> dict:
+    peer_avg_multiple: float,
+    company_metric: Optional[float] = None,
+    stock_info: Optional[str] = None,
+    ticker: Optional[str] = None) -> dict:
     """
     Estimate valuation based on comparable company multiples.
 
     Args:
-        company_metric: the company's own metric (e.g., earnings per share)
         peer_avg_multiple: average multiple from peer group (e.g., P/E ratio)
+        company_metric: the company's own metric (e.g., earnings per share). Optional when stock_info is given
+        stock_info: artifact handle from get_complete_stock_info; its trailing EPS is used as the metric
+        ticker: use the diluted EPS of the ticker's latest extracted 10-K as the metric
 
     Returns:
         dict with estimated value and context
     """
+    info, error = _stock_info(stock_info)
+    if error:
+        return error
+    if company_metric is None and ticker:
+        company_metric = stored_value(ticker, "eps_diluted")
+    if company_metric is None and info:
+        company_metric = info.get("earnings_per_share")
+    if company_metric is None:
+        return {"error": "Missing company metric — pass it, a ticker with extracted filings or a stock_info handle."}
+
     estimated_value = company_metric * peer_avg_multiple
     return {
         "estimated_value": round(estimated_value, 2),
         "explanation": f"Used peer average multiple of {peer_avg_multiple}x on company metric {company_metric}."
     }
-
-
-